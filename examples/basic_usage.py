@@ -34,9 +34,7 @@ def test_string_length(s: str):
 def test_list_operations(nums: list):
     """Test basic list properties"""
     # Test that reversing twice gives the original list
-    reversed_once = list(reversed(nums))
-    reversed_twice = list(reversed(reversed_once))
-    assert reversed_twice == nums
+    assert nums[::-1][::-1] == nums
 
     # Test that sorting is idempotent
     sorted_once = sorted(nums)
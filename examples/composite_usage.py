@@ -5,15 +5,93 @@ This demonstrates how to compose complex data types by drawing from multiple
 strategies within a single test function.
 """
 
+import math
+import operator
+from array import array
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, NamedTuple
+
 from snakecheck import composite, composite_strategy, given, integers, strings
 
 
+# Record types produced by the strategies below; tuples are far lighter than dicts
+class Point(NamedTuple):
+    x: int
+    y: int
+
+
+class User(NamedTuple):
+    name: str
+    age: int
+    email: str
+
+
+class Rectangle(NamedTuple):
+    width: int
+    height: int
+    area: int
+
+
+class Circle(NamedTuple):
+    radius: int
+    area: float
+    perimeter: float
+    type: str = "circle"
+
+
+class RectangleShape(NamedTuple):
+    width: int
+    height: int
+    area: int
+    perimeter: int
+    type: str = "rectangle"
+
+
+class Triangle(NamedTuple):
+    sides: list[int]
+    perimeter: int
+    type: str = "triangle"
+
+
+class TriangleSides(NamedTuple):
+    a: int
+    b: int
+    c: int
+
+
+class BinaryTreeNode(NamedTuple):
+    value: int
+    left: int | None
+    right: int | None
+
+
+class TreeNodeColumns(NamedTuple):
+    ids: array[int]
+    values: array[int]
+    lefts: array[int]
+    rights: array[int]
+
+
+class CartItem(NamedTuple):
+    name: str
+    price: int
+    quantity: int
+    subtotal: int
+
+
+class ShoppingCart(NamedTuple):
+    items: list[CartItem]
+    item_count: int
+    total: int
+
+
 # Example 1: Simple composite strategy using the composite() function
 def point_strategy(draw):
     """Generate a 2D point by drawing x and y coordinates."""
     x = draw(integers(-100, 100))
     y = draw(integers(-100, 100))
-    return {"x": x, "y": y}
+    return Point(x, y)
 
 
 # Example 2: Composite strategy using the decorator syntax
@@ -23,7 +101,7 @@ def user_strategy(draw):
     name = draw(strings(min_length=1, max_length=50))
     age = draw(integers(0, 120))
     email = draw(strings(min_length=5, max_length=100))
-    return {"name": name, "age": age, "email": email}
+    return User(name, age, email)
 
 
 # Example 3: Composite strategy for a rectangle
@@ -32,7 +110,7 @@ def rectangle_strategy(draw):
     """Generate a rectangle by drawing width and height."""
     width = draw(integers(1, 100))
     height = draw(integers(1, 100))
-    return {"width": width, "height": height, "area": width * height}
+    return Rectangle(width, height, width * height)
 
 
 # Example 4: Composite strategy for a list of users
@@ -47,52 +125,65 @@ def user_list_strategy(draw):
 
 
 # Example 5: Nested composite strategies
+_PI = math.pi
+_TAU = math.tau
+
+
+def _build_circle(draw):
+    """Draw a circle and derive its area and perimeter."""
+    radius = draw(integers(1, 50))
+    return Circle(
+        radius=radius,
+        area=_PI * radius * radius,
+        perimeter=_TAU * radius,
+    )
+
+
+def _build_rectangle(draw):
+    """Draw a rectangle and derive its perimeter."""
+    rect = draw(rectangle_strategy)
+    return RectangleShape(
+        width=rect.width,
+        height=rect.height,
+        area=rect.area,
+        perimeter=2 * (rect.width + rect.height),
+    )
+
+
+def _build_triangle(draw):
+    """Draw a triangle, falling back to a 3-4-5 triangle if the sides are invalid."""
+    a = draw(integers(1, 50))
+    b = draw(integers(1, 50))
+    c = draw(integers(1, 50))
+    # Ensure triangle inequality
+    if a + b > c and a + c > b and b + c > a:
+        return Triangle(sides=[a, b, c], perimeter=a + b + c)
+    else:
+        # Fallback to valid triangle
+        return Triangle(sides=[3, 4, 5], perimeter=12)
+
+
+# Indexed by shape_type: 0=circle, 1=rectangle, 2=triangle
+_SHAPE_BUILDERS = (_build_circle, _build_rectangle, _build_triangle)
+
+
 @composite_strategy
 def complex_shape_strategy(draw):
     """Generate a complex shape with multiple properties."""
-    shape_type = draw(integers(0, 2))  # 0=circle, 1=rectangle, 2=triangle
-
-    if shape_type == 0:  # Circle
-        radius = draw(integers(1, 50))
-        return {
-            "type": "circle",
-            "radius": radius,
-            "area": 3.14159 * radius * radius,
-            "perimeter": 2 * 3.14159 * radius,
-        }
-    elif shape_type == 1:  # Rectangle
-        rect = draw(rectangle_strategy)
-        return {
-            "type": "rectangle",
-            "width": rect["width"],
-            "height": rect["height"],
-            "area": rect["area"],
-            "perimeter": 2 * (rect["width"] + rect["height"]),
-        }
-    else:  # Triangle
-        a = draw(integers(1, 50))
-        b = draw(integers(1, 50))
-        c = draw(integers(1, 50))
-        # Ensure triangle inequality
-        if a + b > c and a + c > b and b + c > a:
-            return {"type": "triangle", "sides": [a, b, c], "perimeter": a + b + c}
-        else:
-            # Fallback to valid triangle
-            return {"type": "triangle", "sides": [3, 4, 5], "perimeter": 12}
+    shape_type = draw(integers(0, len(_SHAPE_BUILDERS) - 1))
+    return _SHAPE_BUILDERS[shape_type](draw)
 
 
 # Example 6: Composite strategy with filtering
 @composite_strategy
 def valid_triangle_strategy(draw):
     """Generate a valid triangle that satisfies triangle inequality."""
-    while True:
-        a = draw(integers(1, 50))
-        b = draw(integers(1, 50))
-        c = draw(integers(1, 50))
+    a = draw(integers(1, 50))
+    b = draw(integers(1, 50))
 
-        # Check triangle inequality
-        if a + b > c and a + c > b and b + c > a:
-            return {"a": a, "b": b, "c": c}
+    # Draw c from the range allowed by the triangle inequality instead of rejecting
+    c = draw(integers(abs(a - b) + 1, min(50, a + b - 1)))
+    return TriangleSides(a, b, c)
 
 
 # Example 7: Composite strategy for a binary tree node
@@ -103,28 +194,24 @@ def binary_tree_strategy(draw):
 
     # Simple approach: just generate leaf nodes for now
     # This avoids recursion issues while still demonstrating the concept
-    return {"value": value, "left": None, "right": None}
+    return BinaryTreeNode(value, None, None)
 
 
 # Alternative: Generate a list of tree nodes that can be assembled later
 @composite_strategy
 def tree_node_list_strategy(draw):
-    """Generate a list of tree nodes that can be assembled into a tree."""
+    """Generate tree nodes as parallel int columns that can be assembled into a tree."""
     node_count = draw(integers(1, 10))
-    nodes = []
+    values = array("i")
+    lefts = array("i")
+    rights = array("i")
 
     for i in range(node_count):
-        value = draw(integers(-100, 100))
-        nodes.append(
-            {
-                "id": i,
-                "value": value,
-                "left_child": draw(integers(-1, node_count - 1)) if i < node_count - 1 else -1,
-                "right_child": draw(integers(-1, node_count - 1)) if i < node_count - 1 else -1,
-            }
-        )
+        values.append(draw(integers(-100, 100)))
+        lefts.append(draw(integers(-1, node_count - 1)) if i < node_count - 1 else -1)
+        rights.append(draw(integers(-1, node_count - 1)) if i < node_count - 1 else -1)
 
-    return nodes
+    return TreeNodeColumns(array("i", range(node_count)), values, lefts, rights)
 
 
 # Example 8: Composite strategy for a shopping cart
@@ -132,56 +219,49 @@ def tree_node_list_strategy(draw):
 def shopping_cart_strategy(draw):
     """Generate a shopping cart with items."""
     item_count = draw(integers(0, 10))
-    items = []
-    total = 0
 
-    for _ in range(item_count):
-        name = draw(strings(min_length=3, max_length=20))
-        price = draw(integers(1, 1000))
-        quantity = draw(integers(1, 5))
+    # Draw each field as a column, then derive subtotals and the total in bulk
+    names = [draw(strings(min_length=3, max_length=20)) for _ in range(item_count)]
+    prices = [draw(integers(1, 1000)) for _ in range(item_count)]
+    quantities = [draw(integers(1, 5)) for _ in range(item_count)]
+    subtotals = list(map(operator.mul, prices, quantities))
 
-        item = {"name": name, "price": price, "quantity": quantity, "subtotal": price * quantity}
-        items.append(item)
-        total += item["subtotal"]
-
-    return {"items": items, "item_count": item_count, "total": total}
+    items = [
+        CartItem(name, price, quantity, subtotal)
+        for name, price, quantity, subtotal in zip(
+            names, prices, quantities, subtotals, strict=True
+        )
+    ]
+    return ShoppingCart(items, item_count, sum(subtotals))
 
 
 # Test functions using composite strategies
 @given(composite(point_strategy))
 def test_point_properties(point):
     """Test properties of generated points."""
-    assert "x" in point
-    assert "y" in point
-    assert isinstance(point["x"], int)
-    assert isinstance(point["y"], int)
-    assert -100 <= point["x"] <= 100
-    assert -100 <= point["y"] <= 100
+    assert isinstance(point.x, int)
+    assert isinstance(point.y, int)
+    assert -100 <= point.x <= 100
+    assert -100 <= point.y <= 100
 
 
 @given(user_strategy)
 def test_user_properties(user):
     """Test properties of generated users."""
-    assert "name" in user
-    assert "age" in user
-    assert "email" in user
-    assert isinstance(user["name"], str)
-    assert isinstance(user["age"], int)
-    assert isinstance(user["email"], str)
-    assert 1 <= len(user["name"]) <= 50
-    assert 0 <= user["age"] <= 120
-    assert 5 <= len(user["email"]) <= 100
+    assert isinstance(user.name, str)
+    assert isinstance(user.age, int)
+    assert isinstance(user.email, str)
+    assert 1 <= len(user.name) <= 50
+    assert 0 <= user.age <= 120
+    assert 5 <= len(user.email) <= 100
 
 
 @given(rectangle_strategy)
 def test_rectangle_properties(rect):
     """Test properties of generated rectangles."""
-    assert "width" in rect
-    assert "height" in rect
-    assert "area" in rect
-    assert rect["width"] > 0
-    assert rect["height"] > 0
-    assert rect["area"] == rect["width"] * rect["height"]
+    assert rect.width > 0
+    assert rect.height > 0
+    assert rect.area == rect.width * rect.height
 
 
 @given(user_list_strategy)
@@ -190,39 +270,27 @@ def test_user_list_properties(users):
     assert isinstance(users, list)
     assert len(users) <= 5
     for user in users:
-        assert "name" in user
-        assert "age" in user
-        assert "email" in user
+        assert isinstance(user, User)
 
 
 @given(complex_shape_strategy)
 def test_complex_shape_properties(shape):
     """Test properties of generated complex shapes."""
-    assert "type" in shape
-    assert shape["type"] in ["circle", "rectangle", "triangle"]
-
-    if shape["type"] == "circle":
-        assert "radius" in shape
-        assert "area" in shape
-        assert "perimeter" in shape
-        assert shape["radius"] > 0
-    elif shape["type"] == "rectangle":
-        assert "width" in shape
-        assert "height" in shape
-        assert "area" in shape
-        assert "perimeter" in shape
-        assert shape["width"] > 0
-        assert shape["height"] > 0
+    assert shape.type in ["circle", "rectangle", "triangle"]
+
+    if shape.type == "circle":
+        assert shape.radius > 0
+    elif shape.type == "rectangle":
+        assert shape.width > 0
+        assert shape.height > 0
     else:  # triangle
-        assert "sides" in shape
-        assert "perimeter" in shape
-        assert len(shape["sides"]) == 3
+        assert len(shape.sides) == 3
 
 
 @given(valid_triangle_strategy)
 def test_valid_triangle_properties(triangle):
     """Test properties of generated valid triangles."""
-    a, b, c = triangle["a"], triangle["b"], triangle["c"]
+    a, b, c = triangle.a, triangle.b, triangle.c
     assert a + b > c
     assert a + c > b
     assert b + c > a
@@ -232,51 +300,53 @@ def test_valid_triangle_properties(triangle):
 @given(binary_tree_strategy)
 def test_binary_tree_properties(node):
     """Test properties of generated binary tree nodes."""
-    assert "value" in node
-    assert isinstance(node["value"], int)
-    assert -100 <= node["value"] <= 100
-    assert node["left"] is None
-    assert node["right"] is None
+    assert isinstance(node.value, int)
+    assert -100 <= node.value <= 100
+    assert node.left is None
+    assert node.right is None
 
 
 @given(tree_node_list_strategy)
 def test_tree_node_list_properties(nodes):
     """Test properties of generated tree node lists."""
-    assert isinstance(nodes, list)
-    assert 1 <= len(nodes) <= 10
-
-    for i, node in enumerate(nodes):
-        assert "id" in node
-        assert "value" in node
-        assert "left_child" in node
-        assert "right_child" in node
-        assert node["id"] == i
-        assert isinstance(node["value"], int)
-        assert -100 <= node["value"] <= 100
-        assert isinstance(node["left_child"], int)
-        assert isinstance(node["right_child"], int)
-        assert -1 <= node["left_child"] < len(nodes)
-        assert -1 <= node["right_child"] < len(nodes)
+    assert isinstance(nodes, TreeNodeColumns)
+    node_count = len(nodes.ids)
+    assert 1 <= node_count <= 10
+
+    for i, (node_id, value, left, right) in enumerate(
+        zip(nodes.ids, nodes.values, nodes.lefts, nodes.rights, strict=True)
+    ):
+        assert node_id == i
+        assert isinstance(value, int)
+        assert -100 <= value <= 100
+        assert isinstance(left, int)
+        assert isinstance(right, int)
+        assert -1 <= left < node_count
+        assert -1 <= right < node_count
 
 
 @given(shopping_cart_strategy)
 def test_shopping_cart_properties(cart):
     """Test properties of generated shopping carts."""
-    assert "items" in cart
-    assert "item_count" in cart
-    assert "total" in cart
-    assert isinstance(cart["items"], list)
-    assert len(cart["items"]) == cart["item_count"]
+    assert isinstance(cart.items, list)
+    assert len(cart.items) == cart.item_count
+
+    # Under python -O the asserts are stripped, so skip the passes that only feed them
+    if __debug__:
+        calculated_total = sum(item.subtotal for item in cart.items)
+        assert cart.total == calculated_total
+
+        for item in cart.items:
+            assert item.subtotal == item.price * item.quantity
 
-    calculated_total = sum(item["subtotal"] for item in cart["items"])
-    assert cart["total"] == calculated_total
 
-    for item in cart["items"]:
-        assert "name" in item
-        assert "price" in item
-        assert "quantity" in item
-        assert "subtotal" in item
-        assert item["subtotal"] == item["price"] * item["quantity"]
+def _run(test_name: str, test_func: Callable[[], Any]) -> tuple[str, bool, str | None]:
+    """Run a single property test in a worker process and report its outcome."""
+    try:
+        test_func()
+    except Exception as e:
+        return test_name, False, str(e)
+    return test_name, True, None
 
 
 if __name__ == "__main__":
@@ -298,15 +368,19 @@ if __name__ == "__main__":
     passed = 0
     failed = 0
 
-    for test_name, test_func in tests:
-        try:
+    # The tests are independent, so run them in parallel worker processes
+    with ProcessPoolExecutor() as executor:
+        futures = [executor.submit(_run, test_name, test_func) for test_name, test_func in tests]
+        # Collect in submission order so the report reads the same on every run
+        for future in futures:
+            test_name, ok, error = future.result()
             print(f"\nTesting: {test_name}")
-            test_func()
-            print("   ✓ Passed!")
-            passed += 1
-        except Exception as e:
-            print(f"   ✗ Failed: {e}")
-            failed += 1
+            if ok:
+                print("   ✓ Passed!")
+                passed += 1
+            else:
+                print(f"   ✗ Failed: {error}")
+                failed += 1
 
     print("\n" + "=" * 60)
     print(f"Results: {passed} passed, {failed} failed")
@@ -5,46 +5,192 @@ This demonstrates how to create tests where the generation of later parts
 of a structure depends on earlier generated values.
 """
 
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from math import inf
+from typing import NamedTuple
+
 from snakecheck import choices, composite_strategy, given, integers
 
 
+# Record types produced by the strategies below; tuples are far lighter than dicts
+class LinkedListNode(NamedTuple):
+    value: int
+    next: int | None
+
+
+@dataclass(slots=True)
+class BSTNode:
+    # Mutable, since children are linked in as later values are inserted
+    value: int
+    left: int | None
+    right: int | None
+    insertion_order: int
+
+
+class StackOperation(NamedTuple):
+    operation: str
+    step: int
+    value: int | None = None
+
+
+class GraphNode(NamedTuple):
+    id: int
+    type: str
+    capacity: int
+    priority: int
+    position: int
+
+
+class GraphEdge(NamedTuple):
+    from_node: int
+    to_node: int
+    weight: int
+    type: str
+
+
+class Transaction(NamedTuple):
+    type: str
+    account: str
+    amount: int
+    balance_after: int
+    step: int
+    compensating: bool = False
+
+
+class TransferBalances(NamedTuple):
+    from_balance: int
+    to_balance: int
+
+
+class Transfer(NamedTuple):
+    from_account: str
+    to_account: str
+    amount: int
+    balance_after: TransferBalances
+    step: int
+    type: str = "transfer"
+
+
+# Fixed choice strategies, built once instead of on every draw
+LINK_DEPENDENCY_TYPES = choices(("increment", "decrement", "double", "half", "same"))
+BST_VALUE_STRATEGIES = choices(("random", "near_existing", "extreme"))
+COIN_FLIP = choices((True, False))
+STACK_OPS_FULL = choices(("push", "pop", "pop", "pop"))
+STACK_OPS_NORMAL = choices(("push", "pop", "peek", "size"))
+PUSH_VALUE_STRATEGIES = choices(("random", "increment", "decrement", "average"))
+NODE_TYPES = choices(("source", "sink", "intermediate"))
+TXN_TYPES_SINGLE_FUNDED = choices(("deposit", "deposit", "transfer"))
+TXN_TYPES_MULTI_FUNDED = choices(("deposit", "withdraw", "transfer"))
+ACCOUNTS = ("A", "B", "C")
+# Accounts are drawn by index into ACCOUNTS
+ACCOUNT_INDICES = choices((0, 1, 2))
+# Transaction types by number of funded accounts:
+# none can only deposit, one prefers deposits, several allow everything
+TXN_TYPES_BY_FUNDED_COUNT = (
+    None,
+    TXN_TYPES_SINGLE_FUNDED,
+    TXN_TYPES_MULTI_FUNDED,
+    TXN_TYPES_MULTI_FUNDED,
+)
+
+
+@lru_cache(maxsize=256)
+def int_range(min_value, max_value):
+    """Shared integer strategy for a fixed range, so draws don't rebuild it."""
+    return integers(min_value, max_value)
+
+
+def node_attributes_strategy(capacity_range, priority_range):
+    """Draw a graph node's (capacity, priority, position) as a single unit."""
+    capacity_strategy = int_range(*capacity_range)
+    priority_strategy = int_range(*priority_range)
+    position_strategy = int_range(0, 100)  # Position for distance calculation
+
+    @composite_strategy
+    def node_attributes(draw):
+        return draw(capacity_strategy), draw(priority_strategy), draw(position_strategy)
+
+    return node_attributes
+
+
+def adjusted_edge_weight(
+    base_weight, from_capacity, to_capacity, from_priority, to_priority, from_position, to_position
+):
+    """Adjust an edge's base weight for the differences between its endpoints."""
+    # Adjust weight based on capacity difference
+    capacity_factor = abs(from_capacity - to_capacity) // 10
+
+    # Adjust weight based on priority difference
+    priority_factor = abs(from_priority - to_priority) * 2
+
+    # Adjust weight based on distance
+    distance_factor = abs(from_position - to_position) // 20
+
+    return max(1, base_weight + capacity_factor + priority_factor + distance_factor)
+
+
+NODE_ATTRIBUTES = {
+    "source": node_attributes_strategy((50, 100), (8, 10)),
+    "sink": node_attributes_strategy((20, 50), (1, 3)),
+    "intermediate": node_attributes_strategy((30, 80), (4, 7)),
+}
+
+
+# Base edge weight strategy for every (from type, to type) pair, resolved once at import
+EDGE_BASE_WEIGHTS = {
+    (from_type, to_type): int_range(10, 25)  # Most combinations
+    for from_type in NODE_ATTRIBUTES
+    for to_type in NODE_ATTRIBUTES
+}
+EDGE_BASE_WEIGHTS["source", "sink"] = int_range(5, 15)  # Source to sink: low weight
+EDGE_BASE_WEIGHTS["sink", "source"] = int_range(25, 40)  # Sink to source: high weight
+
+
 # Example 1: Building a linked list where each node's value depends on the previous
 @composite_strategy
 def linked_list_strategy(draw):
     """Generate a linked list where each value depends on the previous."""
-    length = draw(integers(1, 10))
-    nodes = []
+    length = draw(int_range(1, 10))
 
     # First node has a random value
-    first_value = draw(integers(-100, 100))
-    nodes.append({"value": first_value, "next": None})
+    prev_value = draw(int_range(-100, 100))
+    values = [None] * length
+    values[0] = prev_value
 
     # Subsequent nodes depend on previous values
     for i in range(1, length):
-        prev_node = nodes[i - 1]
         # Value depends on previous: could be increment, decrement, or related
-        dependency_type = draw(choices(["increment", "decrement", "double", "half", "same"]))
+        dependency_type = draw(LINK_DEPENDENCY_TYPES)
 
         if dependency_type == "increment":
-            new_value = prev_node["value"] + draw(integers(1, 10))
+            new_value = prev_value + draw(int_range(1, 10))
         elif dependency_type == "decrement":
-            new_value = prev_node["value"] - draw(integers(1, 10))
+            new_value = prev_value - draw(int_range(1, 10))
         elif dependency_type == "double":
             # Only double if it won't exceed bounds
-            new_value = prev_node["value"] * 2
+            new_value = prev_value * 2
             if abs(new_value) > 200:
-                new_value = prev_node["value"] + draw(integers(-10, 10))  # Fallback
+                new_value = prev_value + draw(int_range(-10, 10))  # Fallback
         elif dependency_type == "half":
-            new_value = prev_node["value"] // 2
+            new_value = prev_value // 2
         else:  # same
-            new_value = prev_node["value"]
+            new_value = prev_value
 
         # Ensure the value stays within bounds
-        new_value = max(-200, min(200, new_value))
+        if new_value > 200:
+            new_value = 200
+        elif new_value < -200:
+            new_value = -200
 
-        nodes.append({"value": new_value, "next": None})
-        nodes[i - 1]["next"] = i  # Link to next node
+        values[i] = new_value
+        prev_value = new_value
 
+    # Each node links to the next one; the last ends the list
+    nodes = [LinkedListNode(value, i) for i, value in enumerate(values, 1)]
+    nodes[-1] = LinkedListNode(values[-1], None)
     return nodes
 
 
@@ -52,70 +198,71 @@ def linked_list_strategy(draw):
 @composite_strategy
 def bst_strategy(draw):
     """Generate a binary search tree where insertion order affects structure."""
-    node_count = draw(integers(3, 15))
+    node_count = draw(int_range(3, 15))
     values = []
-    tree = []
+    tree = [None] * node_count
+    # In-order view of the tree: sorted values and the node index holding each
+    values_sorted = []
+    indices_sorted = []
 
     # Generate values in insertion order
     for i in range(node_count):
         if i == 0:
             # First value is random
-            value = draw(integers(-100, 100))
+            value = draw(int_range(-100, 100))
         else:
             # Later values depend on existing tree structure
             # Choose a strategy: random, near existing, or extreme
-            strategy = draw(choices(["random", "near_existing", "extreme"]))
+            strategy = draw(BST_VALUE_STRATEGIES)
 
             if strategy == "random":
-                value = draw(integers(-100, 100))
+                value = draw(int_range(-100, 100))
             elif strategy == "near_existing":
                 # Pick a value near an existing one
                 existing = draw(choices(values))
-                offset = draw(integers(-20, 20))
+                offset = draw(int_range(-20, 20))
                 value = existing + offset
             else:  # extreme
                 # Pick a value that's much smaller or larger
-                if draw(choices([True, False])):
-                    value = draw(integers(-200, -150))  # Much smaller
+                if draw(COIN_FLIP):
+                    value = draw(int_range(-200, -150))  # Much smaller
                 else:
-                    value = draw(integers(150, 200))  # Much larger
+                    value = draw(int_range(150, 200))  # Much larger
 
         values.append(value)
 
         # Insert into tree (simplified BST insertion)
-        tree.append({"value": value, "left": None, "right": None, "insertion_order": i})
-
-    # Build tree structure based on insertion order
-    for i in range(1, node_count):
-        current = tree[i]
-        root = tree[0]
-
-        # Simple BST insertion logic
-        node = root
-        while True:
-            if current["value"] < node["value"]:
-                if node["left"] is None:
-                    node["left"] = i
-                    break
-                else:
-                    node = tree[node["left"]]
-            else:
-                if node["right"] is None:
-                    node["right"] = i
-                    break
-                else:
-                    node = tree[node["right"]]
+        tree[i] = BSTNode(value, None, None, i)
 
-    return {"tree": tree, "values": values, "insertion_order": list(range(node_count))}
+        # The new node hangs off whichever in-order neighbour was inserted last:
+        # the right child of its predecessor or the left child of its successor.
+        # Equal values go right, so they sort after existing ones.
+        pos = bisect_right(values_sorted, value)
+        predecessor = indices_sorted[pos - 1] if pos else -1
+        successor = indices_sorted[pos] if pos < len(indices_sorted) else -1
+        if predecessor > successor:
+            tree[predecessor].right = i
+        elif successor >= 0:
+            tree[successor].left = i
+        values_sorted.insert(pos, value)
+        indices_sorted.insert(pos, i)
+
+    # Each node records its own insertion order, so the result doesn't repeat it
+    return {"tree": tree, "values": values}
 
 
 # Example 3: Building a stack with push/pop operations that depend on current state
 @composite_strategy
 def stack_operations_strategy(draw):
     """Generate a sequence of stack operations that depend on current stack state."""
-    operation_count = draw(integers(5, 20))
-    operations = []
+    operation_count = draw(int_range(5, 20))
+    operations = [None] * operation_count
     stack_size = 0
+    # Running aggregates over every pushed value, so pushes don't rescan operations
+    push_sum = 0
+    push_count = 0
+    push_min = inf
+    push_max = -inf
 
     for i in range(operation_count):
         # Operation choice depends on current stack state
@@ -124,48 +271,50 @@ def stack_operations_strategy(draw):
             operation = "push"
         elif stack_size >= 10:
             # Full stack: prefer pop operations
-            operation = draw(choices(["push", "pop", "pop", "pop"]))
+            operation = draw(STACK_OPS_FULL)
         else:
             # Normal case: choose operation
-            operation = draw(choices(["push", "pop", "peek", "size"]))
+            operation = draw(STACK_OPS_NORMAL)
 
         if operation == "push":
-            # Value to push depends on current stack contents
-            if stack_size == 0:
-                # First push: random value
-                value = draw(integers(-100, 100))
+            # Value to push depends on current stack contents: the first push onto
+            # an empty stack is random, later ones relate to existing values
+            strategy = "random" if stack_size == 0 else draw(PUSH_VALUE_STRATEGIES)
+
+            # Each branch updates only the extremes its value can move
+            if strategy == "increment":
+                # Push a value slightly larger than current max
+                value = push_max + draw(int_range(1, 10))
+                push_max = value
+            elif strategy == "decrement":
+                # Push a value slightly smaller than current min
+                value = push_min - draw(int_range(1, 10))
+                push_min = value
             else:
-                # Subsequent pushes: relate to existing values
-                strategy = draw(choices(["random", "increment", "decrement", "average"]))
-
                 if strategy == "random":
-                    value = draw(integers(-100, 100))
-                elif strategy == "increment":
-                    # Push a value slightly larger than current max
-                    max_val = max(op["value"] for op in operations if op["operation"] == "push")
-                    value = max_val + draw(integers(1, 10))
-                elif strategy == "decrement":
-                    # Push a value slightly smaller than current min
-                    min_val = min(op["value"] for op in operations if op["operation"] == "push")
-                    value = min_val - draw(integers(1, 10))
+                    value = draw(int_range(-100, 100))
                 else:  # average
                     # Push a value near the average of existing values
-                    push_values = [op["value"] for op in operations if op["operation"] == "push"]
-                    avg = sum(push_values) // len(push_values)
-                    value = avg + draw(integers(-10, 10))
+                    avg = push_sum // push_count
+                    value = avg + draw(int_range(-10, 10))
+                push_min = min(push_min, value)
+                push_max = max(push_max, value)
+
+            push_sum += value
+            push_count += 1
 
-            operations.append({"operation": "push", "value": value, "step": i})
+            operations[i] = StackOperation("push", i, value)
             stack_size += 1
 
         elif operation == "pop":
-            operations.append({"operation": "pop", "step": i})
-            stack_size = max(0, stack_size - 1)
+            operations[i] = StackOperation("pop", i)
+            stack_size -= 1  # Pops are only drawn for a non-empty stack
 
         elif operation == "peek":
-            operations.append({"operation": "peek", "step": i})
+            operations[i] = StackOperation("peek", i)
 
         else:  # size
-            operations.append({"operation": "size", "step": i})
+            operations[i] = StackOperation("size", i)
 
     return {
         "operations": operations,
@@ -178,78 +327,62 @@ def stack_operations_strategy(draw):
 @composite_strategy
 def weighted_graph_strategy(draw):
     """Generate a weighted graph where edge weights depend on connected nodes."""
-    node_count = draw(integers(3, 8))
-    nodes = []
-    edges = []
+    node_count = draw(int_range(3, 8))
+    # Node properties are kept column-wise; node records are only built for the result
+    node_types = [None] * node_count
+    node_capacities = [0] * node_count
+    node_priorities = [0] * node_count
+    node_positions = [0] * node_count
 
     # Generate nodes with properties that will influence edge weights
     for i in range(node_count):
-        node_type = draw(choices(["source", "sink", "intermediate"]))
-
-        if node_type == "source":
-            capacity = draw(integers(50, 100))
-            priority = draw(integers(8, 10))
-        elif node_type == "sink":
-            capacity = draw(integers(20, 50))
-            priority = draw(integers(1, 3))
-        else:  # intermediate
-            capacity = draw(integers(30, 80))
-            priority = draw(integers(4, 7))
-
-        nodes.append(
-            {
-                "id": i,
-                "type": node_type,
-                "capacity": capacity,
-                "priority": priority,
-                "position": draw(integers(0, 100)),  # Position for distance calculation
-            }
-        )
+        node_type = draw(NODE_TYPES)
+        capacity, priority, position = draw(NODE_ATTRIBUTES[node_type])
+
+        node_types[i] = node_type
+        node_capacities[i] = capacity
+        node_priorities[i] = priority
+        node_positions[i] = position
 
     # Generate edges with weights that depend on connected nodes
-    edge_count = draw(integers(node_count - 1, node_count * 2))
+    edge_count = draw(int_range(node_count - 1, node_count * 2))
 
-    # Ensure connectivity first
-    for i in range(node_count - 1):
-        weight = draw(integers(1, 20))
-        edges.append({"from": i, "to": i + 1, "weight": weight, "type": "connectivity"})
+    # Ensure connectivity first with a path through every node, built in one pass
+    connectivity_weight = int_range(1, 20)
+    edges = [
+        GraphEdge(i, i + 1, draw(connectivity_weight), "connectivity")
+        for i in range(node_count - 1)
+    ]
 
-    # Add additional edges
+    # Add additional edges. Endpoints are plain indices, so draw them from the shared
+    # integer strategy for the range rather than a choice over a fresh tuple of IDs
+    node_choice = int_range(0, node_count - 1)
     for _ in range(edge_count - (node_count - 1)):
-        from_node = draw(choices(range(node_count)))
-        to_node = draw(choices(range(node_count)))
+        from_node = draw(node_choice)
+        to_node = draw(node_choice)
 
         if from_node != to_node:
-            # Weight depends on node properties
-            from_node_data = nodes[from_node]
-            to_node_data = nodes[to_node]
-
-            # Base weight from node types
-            if from_node_data["type"] == "source" and to_node_data["type"] == "sink":
-                base_weight = draw(integers(5, 15))  # Source to sink: low weight
-            elif from_node_data["type"] == "sink" and to_node_data["type"] == "source":
-                base_weight = draw(integers(25, 40))  # Sink to source: high weight
-            else:
-                base_weight = draw(integers(10, 25))  # Other combinations
-
-            # Adjust weight based on capacity difference
-            capacity_diff = abs(from_node_data["capacity"] - to_node_data["capacity"])
-            capacity_factor = capacity_diff // 10
-
-            # Adjust weight based on priority difference
-            priority_diff = abs(from_node_data["priority"] - to_node_data["priority"])
-            priority_factor = priority_diff * 2
-
-            # Adjust weight based on distance
-            distance = abs(from_node_data["position"] - to_node_data["position"])
-            distance_factor = distance // 20
-
-            final_weight = max(1, base_weight + capacity_factor + priority_factor + distance_factor)
-
-            edges.append(
-                {"from": from_node, "to": to_node, "weight": final_weight, "type": "additional"}
+            # Weight depends on node properties, starting from a base for the node types
+            base_weight = draw(EDGE_BASE_WEIGHTS[node_types[from_node], node_types[to_node]])
+
+            final_weight = adjusted_edge_weight(
+                base_weight,
+                node_capacities[from_node],
+                node_capacities[to_node],
+                node_priorities[from_node],
+                node_priorities[to_node],
+                node_positions[from_node],
+                node_positions[to_node],
             )
 
+            edges.append(GraphEdge(from_node, to_node, final_weight, "additional"))
+
+    nodes = [
+        GraphNode(i, *properties)
+        for i, properties in enumerate(
+            zip(node_types, node_capacities, node_priorities, node_positions, strict=True)
+        )
+    ]
     return {"nodes": nodes, "edges": edges, "node_count": node_count, "edge_count": len(edges)}
 
 
@@ -257,155 +390,122 @@ def weighted_graph_strategy(draw):
 @composite_strategy
 def transaction_sequence_strategy(draw):
     """Generate a sequence of database transactions with state-dependent constraints."""
-    transaction_count = draw(integers(5, 15))
-    transactions = []
-    account_balances = {"A": 1000, "B": 1000, "C": 1000}  # Initial state
+    transaction_count = draw(int_range(5, 15))
+    # Every step records exactly one transaction; compensating ones are appended after
+    transactions = [None] * transaction_count
+    # Balance ledger indexed like ACCOUNTS; names are only looked up for records
+    balances = array("l", (1000, 1000, 1000))  # Initial state
+    # Accounts with a positive balance, rebuilt only when one crosses zero
+    available_accounts = (0, 1, 2)
+    available_choice = choices(available_accounts)
+    transaction_types = TXN_TYPES_BY_FUNDED_COUNT[3]
+    funding_changed = False
 
     for i in range(transaction_count):
         # Transaction type depends on current account states
-        available_accounts = [acc for acc, bal in account_balances.items() if bal > 0]
-
-        if not available_accounts:
-            # All accounts empty: can only do deposits
-            transaction_type = "deposit"
-        elif len(available_accounts) == 1:
-            # Only one account has money: prefer deposits
-            transaction_type = draw(choices(["deposit", "deposit", "transfer"]))
-        else:
-            # Multiple accounts have money: all operations possible
-            transaction_type = draw(choices(["deposit", "withdraw", "transfer"]))
+        if funding_changed:
+            available_accounts = tuple(acc for acc in (0, 1, 2) if balances[acc] > 0)
+            available_choice = choices(available_accounts)
+            transaction_types = TXN_TYPES_BY_FUNDED_COUNT[len(available_accounts)]
+            funding_changed = False
+
+        # All accounts empty: can only do deposits
+        transaction_type = "deposit" if transaction_types is None else draw(transaction_types)
 
         if transaction_type == "deposit":
-            account = draw(choices(["A", "B", "C"]))
-            amount = draw(integers(10, 200))
-            account_balances[account] += amount
+            account = draw(ACCOUNT_INDICES)
+            amount = draw(int_range(10, 200))
+            balances[account] += amount
+            funding_changed = account not in available_accounts
 
-            transactions.append(
-                {
-                    "type": "deposit",
-                    "account": account,
-                    "amount": amount,
-                    "balance_after": account_balances[account],
-                    "step": i,
-                }
+            transactions[i] = Transaction(
+                "deposit", ACCOUNTS[account], amount, balances[account], i
             )
 
         elif transaction_type == "withdraw":
             # Can only withdraw from accounts with sufficient balance
-            account = draw(choices(available_accounts))
-            max_withdrawal = account_balances[account]
-            amount = draw(integers(10, min(max_withdrawal, 200)))
-            account_balances[account] -= amount
-
-            transactions.append(
-                {
-                    "type": "withdraw",
-                    "account": account,
-                    "amount": amount,
-                    "balance_after": account_balances[account],
-                    "step": i,
-                }
+            account = draw(available_choice)
+            max_withdrawal = balances[account]
+            amount = draw(int_range(10, min(max_withdrawal, 200)))
+            balances[account] -= amount
+            funding_changed = balances[account] == 0
+
+            transactions[i] = Transaction(
+                "withdraw", ACCOUNTS[account], amount, balances[account], i
             )
 
         else:  # transfer
             # Can only transfer between accounts with sufficient balance
-            from_account = draw(choices(available_accounts))
-            to_account = draw(choices(["A", "B", "C"]))
+            from_account = draw(available_choice)
+            to_account = draw(ACCOUNT_INDICES)
 
             if from_account != to_account:
-                max_transfer = account_balances[from_account]
-                amount = draw(integers(10, min(max_transfer, 150)))
-
-                account_balances[from_account] -= amount
-                account_balances[to_account] += amount
-
-                transactions.append(
-                    {
-                        "type": "transfer",
-                        "from_account": from_account,
-                        "to_account": to_account,
-                        "amount": amount,
-                        "balance_after": {
-                            "from": account_balances[from_account],
-                            "to": account_balances[to_account],
-                        },
-                        "step": i,
-                    }
+                max_transfer = balances[from_account]
+                amount = draw(int_range(10, min(max_transfer, 150)))
+
+                balances[from_account] -= amount
+                balances[to_account] += amount
+                funding_changed = (
+                    balances[from_account] == 0 or to_account not in available_accounts
+                )
+
+                transactions[i] = Transfer(
+                    ACCOUNTS[from_account],
+                    ACCOUNTS[to_account],
+                    amount,
+                    TransferBalances(balances[from_account], balances[to_account]),
+                    i,
                 )
             else:
                 # If same account, do a deposit instead
-                amount = draw(integers(10, 200))
-                account_balances[from_account] += amount
-
-                transactions.append(
-                    {
-                        "type": "deposit",
-                        "account": from_account,
-                        "amount": amount,
-                        "balance_after": account_balances[from_account],
-                        "step": i,
-                    }
+                amount = draw(int_range(10, 200))
+                balances[from_account] += amount
+
+                transactions[i] = Transaction(
+                    "deposit", ACCOUNTS[from_account], amount, balances[from_account], i
                 )
 
-    # Verify total balance is preserved
-    total_balance = sum(account_balances.values())
-    if total_balance != 3000:
-        # If balance is wrong, add a compensating transaction
-        diff = 3000 - total_balance
-        if diff > 0:
-            # Need to add money
-            account = draw(choices(["A", "B", "C"]))
-            account_balances[account] += diff
-            transactions.append(
-                {
-                    "type": "deposit",
-                    "account": account,
-                    "amount": diff,
-                    "balance_after": account_balances[account],
-                    "step": len(transactions),
-                    "compensating": True,
-                }
+    # Restore the total balance with deterministic compensating transactions, so
+    # reconciliation adds no draws for shrinking to explore
+    diff = 3000 - (balances[0] + balances[1] + balances[2])
+    if diff > 0:
+        # Need to add money: deposit it all into the richest account
+        account = max((0, 1, 2), key=balances.__getitem__)
+        balances[account] += diff
+        transactions.append(
+            Transaction(
+                "deposit",
+                ACCOUNTS[account],
+                diff,
+                balances[account],
+                len(transactions),
+                compensating=True,
             )
-        else:
-            # Need to remove money - find an account with sufficient balance
-            available_accounts = [acc for acc, bal in account_balances.items() if bal >= abs(diff)]
-            if available_accounts:
-                account = draw(choices(available_accounts))
-                account_balances[account] += diff  # diff is negative
-                transactions.append(
-                    {
-                        "type": "withdraw",
-                        "account": account,
-                        "amount": abs(diff),
-                        "balance_after": account_balances[account],
-                        "step": len(transactions),
-                        "compensating": True,
-                    }
+        )
+    elif diff < 0:
+        # Need to remove money: withdraw from the richest accounts first. The total
+        # is above 3000 here, so this always covers the excess in at most three steps.
+        excess = -diff
+        for account in sorted((0, 1, 2), key=balances.__getitem__, reverse=True):
+            amount = min(excess, balances[account])
+            balances[account] -= amount
+            excess -= amount
+            transactions.append(
+                Transaction(
+                    "withdraw",
+                    ACCOUNTS[account],
+                    amount,
+                    balances[account],
+                    len(transactions),
+                    compensating=True,
                 )
-            else:
-                # If no account has sufficient balance, add money to all accounts proportionally
-                # This ensures we always end up with the correct total
-                accounts = ["A", "B", "C"]
-                for i, account in enumerate(accounts):
-                    share = diff // 3
-                    if i == 0:  # First account gets the remainder
-                        share += diff % 3
-                    account_balances[account] += share
-                    if share > 0:
-                        transactions.append(
-                            {
-                                "type": "deposit",
-                                "account": account,
-                                "amount": share,
-                                "balance_after": account_balances[account],
-                                "step": len(transactions),
-                                "compensating": True,
-                            }
-                        )
+            )
+            if not excess:
+                break
 
     return {
         "transactions": transactions,
-        "final_balances": account_balances.copy(),
+        "final_balances": dict(zip(ACCOUNTS, balances, strict=True)),
         "total_transactions": len(transactions),
     }
 
@@ -417,16 +517,15 @@ def test_linked_list_properties(nodes):
     assert len(nodes) >= 1
     assert len(nodes) <= 10
 
-    # Check that all nodes have values
+    # Check node values
     for node in nodes:
-        assert "value" in node
-        assert isinstance(node["value"], int)
-        assert -200 <= node["value"] <= 200  # Allow for the full range
+        assert isinstance(node.value, int)
+        assert -200 <= node.value <= 200  # Allow for the full range
 
     # Check linking structure
     for i in range(len(nodes) - 1):
-        assert nodes[i]["next"] == i + 1
-    assert nodes[-1]["next"] is None
+        assert nodes[i].next == i + 1
+    assert nodes[-1].next is None
 
 
 @given(bst_strategy)
@@ -437,19 +536,15 @@ def test_bst_properties(bst_data):
     assert len(tree) >= 3
     assert len(tree) <= 15
 
-    # Check BST property: left child < parent < right child
+    # Check BST property (left child < parent <= right child) and that
+    # insertion order is preserved, in one pass
     for i, node in enumerate(tree):
-        if node["left"] is not None:
-            left_node = tree[node["left"]]
-            assert left_node["value"] < node["value"], f"BST property violated at node {i}"
-
-        if node["right"] is not None:
-            right_node = tree[node["right"]]
-            assert right_node["value"] >= node["value"], f"BST property violated at node {i}"
-
-    # Check that insertion order is preserved
-    for i, node in enumerate(tree):
-        assert node["insertion_order"] == i
+        value, left, right = node.value, node.left, node.right
+        if left is not None:
+            assert tree[left].value < value, f"BST property violated at node {i}"
+        if right is not None:
+            assert tree[right].value >= value, f"BST property violated at node {i}"
+        assert node.insertion_order == i
 
 
 @given(stack_operations_strategy)
@@ -464,9 +559,9 @@ def test_stack_operations_properties(stack_data):
     # Simulate stack operations to verify consistency
     stack = []
     for op in operations:
-        if op["operation"] == "push":
-            stack.append(op["value"])
-        elif op["operation"] == "pop" and stack:
+        if op.operation == "push":
+            stack.append(op.value)
+        elif op.operation == "pop" and stack:
             stack.pop()
         # peek and size don't change stack
 
@@ -475,10 +570,10 @@ def test_stack_operations_properties(stack_data):
     # Check that we never pop from empty stack
     stack = []
     for op in operations:
-        if op["operation"] == "pop" and stack:
+        if op.operation == "pop" and stack:
             stack.pop()
-        elif op["operation"] == "push":
-            stack.append(op["value"])
+        elif op.operation == "push":
+            stack.append(op.value)
 
 
 @given(weighted_graph_strategy)
@@ -492,27 +587,19 @@ def test_weighted_graph_properties(graph_data):
     assert len(edges) >= len(nodes) - 1  # At least spanning tree
 
     # Check node properties
-    for node in nodes:
-        assert "id" in node
-        assert "type" in node
-        assert "capacity" in node
-        assert "priority" in node
-        assert "position" in node
-        assert node["type"] in ["source", "sink", "intermediate"]
-        assert 20 <= node["capacity"] <= 100
-        assert 1 <= node["priority"] <= 10
-        assert 0 <= node["position"] <= 100
+    for _, node_type, capacity, priority, position in nodes:
+        assert node_type in ("source", "sink", "intermediate")
+        assert 20 <= capacity <= 100
+        assert 1 <= priority <= 10
+        assert 0 <= position <= 100
 
     # Check edge properties
-    for edge in edges:
-        assert "from" in edge
-        assert "to" in edge
-        assert "weight" in edge
-        assert "type" in edge
-        assert 0 <= edge["from"] < len(nodes)
-        assert 0 <= edge["to"] < len(nodes)
-        assert edge["weight"] >= 1
-        assert edge["type"] in ["connectivity", "additional"]
+    node_count = len(nodes)
+    for from_node, to_node, weight, edge_type in edges:
+        assert 0 <= from_node < node_count
+        assert 0 <= to_node < node_count
+        assert weight >= 1
+        assert edge_type in ("connectivity", "additional")
 
 
 @given(transaction_sequence_strategy)
@@ -526,11 +613,11 @@ def test_transaction_sequence_properties(txn_data):
 
     # Verify that no account goes negative
     for txn in transactions:
-        if txn["type"] == "withdraw":
-            assert txn["balance_after"] >= 0
-        elif txn["type"] == "transfer":
-            assert txn["balance_after"]["from"] >= 0
-            assert txn["balance_after"]["to"] >= 0
+        if txn.type == "withdraw":
+            assert txn.balance_after >= 0
+        elif txn.type == "transfer":
+            assert txn.balance_after.from_balance >= 0
+            assert txn.balance_after.to_balance >= 0
 
     # Verify final balances are consistent
     expected_total = 3000  # Initial total
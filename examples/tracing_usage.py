@@ -94,19 +94,19 @@ def matrix_strategy(draw: TraceableDrawFn):
         row = []
         remaining_sum = row_sums[i]
 
-        for j in range(cols):
-            if j == cols - 1:
-                # Last element must make the row sum correct
-                element = remaining_sum
-            else:
-                # Other elements depend on remaining sum
-                max_element = min(remaining_sum, 10)
-                element = draw(integers(0, max_element))
-                remaining_sum -= element
+        for j in range(cols - 1):
+            # Other elements depend on remaining sum
+            max_element = min(remaining_sum, 10)
+            element = draw(integers(0, max_element))
+            remaining_sum -= element
 
             draw.record_assignment(f"element_{i}_{j}", element)
             row.append(element)
 
+        # Last element must make the row sum correct
+        draw.record_assignment(f"element_{i}_{cols - 1}", remaining_sum)
+        row.append(remaining_sum)
+
         matrix.append(row)
 
     return {"rows": rows, "cols": cols, "row_sums": row_sums, "matrix": matrix}
@@ -130,12 +130,15 @@ def graph_strategy(draw: TraceableDrawFn):
     edge_count = draw(integers(node_count - 1, node_count * 2))
     draw.record_assignment("edge_count", edge_count)
 
+    # Every endpoint is drawn from the same node range
+    node_choice = choices(range(node_count))
+
     edges = []
     for i in range(edge_count):
-        from_node = draw(choices(range(node_count)))
+        from_node = draw(node_choice)
         draw.record_assignment(f"edge_{i}_from", from_node)
 
-        to_node = draw(choices(range(node_count)))
+        to_node = draw(node_choice)
         draw.record_assignment(f"edge_{i}_to", to_node)
 
         # Edge weight depends on connected node capacities
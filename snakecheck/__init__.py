@@ -2,7 +2,13 @@
 SnakeCheck - A simple Hypothesis clone for property-based testing.
 """
 
-from .composite import CompositeStrategy, composite, composite_strategy, traced_composite
+from .composite import (
+    CompositeStrategy,
+    TracedCompositeStrategy,
+    composite,
+    composite_strategy,
+    traced_composite,
+)
 from .core import given, strategy
 from .generators import Strategy, booleans, choices, floats, integers, lists, strings
 from .property import PropertyTest, forall
@@ -26,6 +32,7 @@ __all__ = [
     "composite_strategy",
     "traced_composite",
     "CompositeStrategy",
+    "TracedCompositeStrategy",
     "GenerationTrace",
     "TraceableDrawFn",
     "create_traceable_draw",
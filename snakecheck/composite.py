@@ -5,7 +5,7 @@ This module provides a way to compose complex data types by drawing from multipl
 strategies within a single test function, similar to Hypothesis's composite approach.
 """
 
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
 from typing import Any, Protocol, TypeVar
 
 from .generators import Strategy
@@ -22,28 +22,115 @@ class DrawFn(Protocol):
         ...
 
 
+def _draw[V](strategy: Strategy[V]) -> V:
+    """Untraced draw function shared by every plain generate() call."""
+    return strategy.generate()
+
+
 class CompositeStrategy(Strategy[T]):
     """Strategy that composes complex data types using a draw function."""
 
+    __slots__ = ("draw_fn",)
+
     def __init__(self, draw_fn: Callable[[DrawFn], T]):
         super().__init__()
         self.draw_fn = draw_fn
 
     def generate(self) -> T:
         """Generate a value using the composite draw function."""
-        return self.draw_fn(self._draw)
+        return self.draw_fn(_draw)
+
+    def generate_with_trace(
+        self, sampler: Callable[[Strategy[Any]], Any] | None = None
+    ) -> tuple[T, GenerationTrace]:
+        """
+        Generate a value and return it along with the generation trace.
+
+        Args:
+            sampler: Optional function used instead of strategy.generate() for
+                each draw, e.g. to bias generation toward likely failures.
+        """
+        draw_fn, trace = create_traceable_draw(sampler)
+        result = self.draw_fn(draw_fn)
+        return result, trace
+
+    def generate_many_with_trace(
+        self, n: int, sampler: Callable[[Strategy[Any]], Any] | None = None
+    ) -> list[tuple[T, GenerationTrace]]:
+        """Generate n values, each paired with its own generation trace."""
+        draw_fn = self.draw_fn
+        samples = []
+        for _ in range(n):
+            traceable_draw, trace = create_traceable_draw(sampler)
+            samples.append((draw_fn(traceable_draw), trace))
+        return samples
 
-    def _draw(self, strategy: Strategy[Any]) -> Any:
-        """Internal draw function that generates values from strategies."""
+
+class _UntracedDrawFn(TraceableDrawFn):
+    """Traceable draw function that records nothing, for plain generate() calls."""
+
+    def __init__(self) -> None:
+        super().__init__(GenerationTrace())
+
+    def __call__(self, strategy: Strategy[Any]) -> Any:
         return strategy.generate()
 
-    def generate_with_trace(self) -> tuple[T, GenerationTrace]:
-        """Generate a value and return it along with the generation trace."""
-        from .trace import create_traceable_draw
+    def with_dependencies(self, dependencies: list[str]) -> TraceableDrawFn:
+        return self
 
-        draw_fn, trace = create_traceable_draw()
-        result = self.draw_fn(draw_fn)
-        return result, trace
+    def push_dependencies(self) -> None:
+        pass
+
+    def pop_dependencies(self) -> None:
+        pass
+
+    def record_assignment(self, var_name: Hashable, value: Any = None) -> None:
+        pass
+
+
+# Stateless, so a single instance serves every untraced generation
+_UNTRACED_DRAW = _UntracedDrawFn()
+
+
+class TracedCompositeStrategy(CompositeStrategy[T]):
+    """Composite strategy whose draw function records assignments and dependencies."""
+
+    __slots__ = ("traced_fn",)
+
+    def __init__(self, traced_fn: Callable[[TraceableDrawFn], T]):
+        super().__init__(self._untraced_draw_fn)
+        self.traced_fn = traced_fn
+
+    def _untraced_draw_fn(self, draw: DrawFn) -> T:
+        # Values generated without a trace skip all recording
+        return self.traced_fn(_UNTRACED_DRAW)
+
+    def generate(self) -> T:
+        """Generate a value without building a trace."""
+        return self.traced_fn(_UNTRACED_DRAW)
+
+    def generate_batch(self, n: int) -> list[T]:
+        """Generate n values without building traces, e.g. for @given's examples."""
+        traced_fn = self.traced_fn
+        return [traced_fn(_UNTRACED_DRAW) for _ in range(n)]
+
+    def generate_with_trace(
+        self, sampler: Callable[[Strategy[Any]], Any] | None = None
+    ) -> tuple[T, GenerationTrace]:
+        """Generate a value and its trace, calling the traced function directly."""
+        draw_fn, trace = create_traceable_draw(sampler)
+        return self.traced_fn(draw_fn), trace
+
+    def generate_many_with_trace(
+        self, n: int, sampler: Callable[[Strategy[Any]], Any] | None = None
+    ) -> list[tuple[T, GenerationTrace]]:
+        """Generate n values, each paired with its own generation trace."""
+        traced_fn = self.traced_fn
+        samples = []
+        for _ in range(n):
+            traceable_draw, trace = create_traceable_draw(sampler)
+            samples.append((traced_fn(traceable_draw), trace))
+        return samples
 
 
 def composite[T](draw_fn: Callable[[DrawFn], T]) -> CompositeStrategy[T]:
@@ -91,7 +178,7 @@ def composite_strategy[T](func: Callable[[DrawFn], T]) -> CompositeStrategy[T]:
     return CompositeStrategy(func)
 
 
-def traced_composite[T](func: Callable[[TraceableDrawFn], T]) -> CompositeStrategy[T]:
+def traced_composite[T](func: Callable[[TraceableDrawFn], T]) -> TracedCompositeStrategy[T]:
     """
     Create a composite strategy that records generation traces.
 
@@ -109,14 +196,4 @@ def traced_composite[T](func: Callable[[TraceableDrawFn], T]) -> CompositeStrate
 
             return {"x": x, "y": y}
     """
-
-    def wrapper(draw: DrawFn) -> T:
-        # Convert regular draw to traceable draw if needed
-        if isinstance(draw, TraceableDrawFn):
-            return func(draw)
-        else:
-            # Create a new trace for this generation
-            traceable_draw, _ = create_traceable_draw()
-            return func(traceable_draw)
-
-    return CompositeStrategy(wrapper)
+    return TracedCompositeStrategy(func)
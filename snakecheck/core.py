@@ -5,9 +5,11 @@ Core functionality for SnakeCheck property-based testing.
 import functools
 import random
 from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from itertools import repeat
 from typing import Any, TypeVar
 
-from .generators import Strategy
+from .generators import Strategy, _seeded_generators
 
 T = TypeVar("T")
 F = TypeVar("F", bound=Callable[..., Any])
@@ -37,22 +39,33 @@ def given(
     def decorator(func: F) -> F:
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
+            seeding: AbstractContextManager[None] = nullcontext()
             if seed is not None:
+                # Nested strategies draw from the seeded shared generator; top-level
+                # strategies get their own generators only while the batches are drawn
                 random.seed(seed)
+                seeding = _seeded_generators(strategies, seed)
+
+            # Generate all examples up front, one batch per strategy
+            with seeding:
+                batches = [strat.generate_batch(max_examples) for strat in strategies]
+
+            # Pair up the i-th value of every batch; with no strategies, the test
+            # still runs once per example without arguments
+            examples = zip(*batches, strict=True) if batches else repeat((), max_examples)
 
             # Run the test multiple times with different generated values
-            for i in range(max_examples):
+            result = None
+            for i, values in enumerate(examples):
                 try:
-                    # Generate test data from strategies
-                    test_data = [strat.generate() for strat in strategies]
-
                     # Call the function with generated data
-                    result = func(*test_data, *args, **kwargs)
+                    result = func(*values, *args, **kwargs)
 
                     # If we get here without exception, the test passed for this example
 
                 except Exception as e:
                     # Test failed - try to shrink the failing example
+                    test_data = list(values)
                     print(f"Test failed on example {i + 1}: {test_data}")
                     print(f"Error: {e}")
 
@@ -71,6 +84,31 @@ def given(
     return decorator
 
 
+# Shift amounts and matching float scales for successive halvings of a value
+_SHRINK_SHIFTS = range(1, 11)
+_SHRINK_SCALES = tuple(0.5**shift for shift in _SHRINK_SHIFTS)
+
+
+def _shrink_candidates(value: float) -> list[float]:
+    """All halving candidates for a numeric value, from largest to smallest."""
+    if isinstance(value, int):
+        # Shifting floors like //, negative values included
+        return [value >> shift for shift in _SHRINK_SHIFTS]
+    # Scaling by a power of two is exact, so this matches dividing
+    return [value * scale for scale in _SHRINK_SCALES]
+
+
+def _fails(
+    func: Callable[..., Any], data: list[Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> bool:
+    """Whether calling func with the given data raises."""
+    try:
+        func(*data, *args, **kwargs)
+    except Exception:
+        return True
+    return False
+
+
 def _shrink_failing_example(
     func: Callable[..., Any],
     failing_data: list[Any],
@@ -84,22 +122,14 @@ def _shrink_failing_example(
     for i, value in enumerate(failing_data):
         if isinstance(value, int | float):
             # Try smaller values
-            for attempt in range(10):
-                if isinstance(value, int):
-                    test_value = value // (2 ** (attempt + 1))
-                else:
-                    test_value = value / (2 ** (attempt + 1))
+            for test_value in _shrink_candidates(value):
+                # Try the candidate in place; if it still fails, keep the smaller value
+                previous = shrunk_data[i]
+                shrunk_data[i] = test_value
 
-                test_data = shrunk_data.copy()
-                test_data[i] = test_value
-
-                try:
-                    func(*test_data, *args, **kwargs)
+                if not _fails(func, shrunk_data, args, kwargs):
                     # If this passes, we can't shrink further
+                    shrunk_data[i] = previous
                     break
-                except Exception:
-                    # This still fails, keep the smaller value
-                    shrunk_data[i] = test_value
-                    continue
 
     return shrunk_data if shrunk_data != failing_data else None
@@ -2,27 +2,79 @@
 Data generators for SnakeCheck property-based testing.
 """
 
+import functools
 import random
 import string
 from abc import ABC, abstractmethod
-from collections.abc import Callable
-from typing import Any, TypeVar
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from itertools import compress
+from typing import Any, Self, TypeVar
 
 T = TypeVar("T")
 
+# Batch sizes for FilteredStrategy's retries after a first rejected draw (99 in total)
+_FILTER_BATCH_SIZES = (3, 8, 16, 32, 40)
+
+# 100 rejected candidates in a row, as FilteredStrategy records them
+_REJECTION_RUN = bytes(100)
+
+_DEFAULT_ALPHABET = string.ascii_letters + string.digits + string.punctuation
+
+# The generator behind the random module's functions, so random.seed() still
+# reproduces draws from strategies that were never seeded themselves
+_SHARED_RNG: random.Random = random.random.__self__  # type: ignore[attr-defined]
+
+
+@functools.cache
+def _ascii_byte_table(alphabet: str) -> tuple[bytes, bytes] | None:
+    """
+    Build a bytes.translate() table mapping random bytes onto an ASCII alphabet.
+
+    Byte values are assigned to characters round-robin; the leftover values
+    that would make some characters more likely are returned separately, to
+    be deleted before translating. Returns None for non-ASCII or oversized
+    alphabets.
+    """
+    if not alphabet.isascii() or len(alphabet) > 256:
+        return None
+    usable = 256 - 256 % len(alphabet)
+    chars = alphabet.encode("ascii")
+    table = bytes(chars[i % len(chars)] for i in range(usable)) + bytes(256 - usable)
+    return table, bytes(range(usable, 256))
+
 
 class Strategy[T](ABC):
     """Base class for data generation strategies."""
 
+    __slots__ = ("_rng", "max_value", "min_value")
+
     def __init__(self, min_value: Any | None = None, max_value: Any | None = None):
         self.min_value = min_value
         self.max_value = max_value
+        # Source of randomness: the shared generator unless seed() gives this
+        # strategy its own
+        self._rng = _SHARED_RNG
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Self:
+        # Strategies are never mutated by drawing from them, so copied traces
+        # can share them (and their generator) with the original
+        return self
+
+    def seed(self, seed: int | None) -> None:
+        """Give this strategy its own random generator, seeded with seed."""
+        self._rng = random.Random(seed)
 
     @abstractmethod
     def generate(self) -> T:
         """Generate a value according to this strategy."""
         pass
 
+    def generate_batch(self, n: int) -> list[T]:
+        """Generate n values at once; subclasses may override this with a bulk draw."""
+        generate = self.generate
+        return [generate() for _ in range(n)]
+
     def map(self, func: Callable[[T], Any]) -> "Strategy[Any]":
         """Apply a function to generated values."""
         return MappedStrategy(self, func)
@@ -35,6 +87,8 @@ class Strategy[T](ABC):
 class MappedStrategy(Strategy[Any]):
     """Strategy that applies a function to generated values."""
 
+    __slots__ = ("base_strategy", "func")
+
     def __init__(self, base_strategy: Strategy[Any], func: Callable[[Any], Any]):
         super().__init__()
         self.base_strategy = base_strategy
@@ -43,72 +97,254 @@ class MappedStrategy(Strategy[Any]):
     def generate(self) -> Any:
         return self.func(self.base_strategy.generate())
 
+    def generate_batch(self, n: int) -> list[Any]:
+        # Apply func over the base strategy's bulk draw with the C-level map()
+        return list(map(self.func, self.base_strategy.generate_batch(n)))
+
 
 class FilteredStrategy(Strategy[T]):
-    """Strategy that filters generated values."""
+    """
+    Strategy that filters generated values.
+
+    generate() always uses rejection sampling. generate_batch() over an
+    IntegerStrategy whose range is no larger than the batch instead evaluates
+    the predicate once per value in the range, assuming it is pure, and samples
+    the passing values directly; if the predicate raises on any value there,
+    it falls back to rejection sampling for that range.
+    """
+
+    __slots__ = ("_passing", "base_strategy", "predicate")
 
     def __init__(self, base_strategy: Strategy[T], predicate: Callable[[T], bool]):
         super().__init__()
         self.base_strategy = base_strategy
         self.predicate = predicate
+        # (bounds, passing values or None if the predicate raised) for an IntegerStrategy base
+        self._passing: tuple[tuple[int, int], list[Any] | None] | None = None
+
+    def _passing_integers(self, n: int) -> list[Any] | None:
+        """Tabulate the passing values of an integer base no wider than n, or return None."""
+        base_strategy = self.base_strategy
+        if type(base_strategy) is not IntegerStrategy:
+            return None
+        bounds = (base_strategy.min_value, base_strategy.max_value)
+        if self._passing is None or self._passing[0] != bounds:
+            low, high = bounds
+            # Only worth it when the table costs no more predicate calls than the batch
+            if not 0 <= high - low < n:
+                return None
+            predicate: Callable[[Any], bool] = self.predicate
+            try:
+                passing = list(filter(predicate, range(low, high + 1)))
+            except Exception:
+                # Values rejection sampling might never draw; let it decide instead
+                passing = None
+            self._passing = (bounds, passing)
+        return self._passing[1]
 
     def generate(self) -> T:
         # Try up to 100 times to find a value that passes the predicate
-        for _ in range(100):
-            value = self.base_strategy.generate()
-            if self.predicate(value):
-                return value
+        base_strategy = self.base_strategy
+        predicate = self.predicate
+        generate = base_strategy.generate
+        value = generate()
+        if predicate(value):
+            return value
+
+        if type(base_strategy).generate_batch is Strategy.generate_batch:
+            for _ in range(99):
+                value = generate()
+                if predicate(value):
+                    return value
+        else:
+            # After a rejection, strategies with a bulk generate_batch draw the
+            # remaining attempts in growing batches and filter them in C
+            for size in _FILTER_BATCH_SIZES:
+                for value in filter(predicate, base_strategy.generate_batch(size)):
+                    return value
         raise ValueError("Could not generate value satisfying predicate")
 
+    def generate_batch(self, n: int) -> list[T]:
+        base_strategy = self.base_strategy
+        if n <= 0 or type(base_strategy).generate_batch is Strategy.generate_batch:
+            return super().generate_batch(n)
+
+        passing = self._passing_integers(n)
+        if passing is not None:
+            if not passing:
+                raise ValueError("Could not generate value satisfying predicate")
+            # Uniform over the passing values, as rejection sampling would be
+            return base_strategy._rng.choices(passing, k=n)
+
+        # Like generate(), each value gets up to 100 attempts, so a run of 100
+        # rejections before the batch is full fails. Outcomes are kept as one
+        # byte per candidate, so bytes.find spots such a run in C
+        predicate = self.predicate
+        values: list[T] = []
+        misses = 0
+        attempts = 0
+        size = n
+        while True:
+            candidates = base_strategy.generate_batch(size)
+            try:
+                passed = bytes(map(predicate, candidates))
+            except (TypeError, ValueError):
+                # Results that don't fit in a byte, such as strings or large ints
+                passed = bytes(map(bool, map(predicate, candidates)))
+            attempts += size
+            accepted = list(compress(candidates, passed))
+            # Rejections left over from the previous batch continue its last run
+            outcomes = bytes(misses) + passed
+            run_start = outcomes.find(_REJECTION_RUN)
+            if run_start != -1:
+                values += accepted[: run_start - outcomes.count(0, 0, run_start)]
+                if len(values) >= n:
+                    return values[:n]
+                raise ValueError("Could not generate value satisfying predicate")
+            values += accepted
+            if len(values) >= n:
+                return values[:n]
+            misses = len(outcomes) - len(outcomes.rstrip(b"\0"))
+            # Draw enough for the missing values at the acceptance rate seen so far
+            size = (n - len(values)) * attempts // max(len(values), 1) + 1
+
 
 class IntegerStrategy(Strategy[int]):
     """Strategy for generating integers."""
 
+    __slots__ = ()
+
     def __init__(self, min_value: int | None = None, max_value: int | None = None):
         super().__init__(min_value, max_value)
         self.min_value: int = min_value if min_value is not None else -1000
         self.max_value: int = max_value if max_value is not None else 1000
 
     def generate(self) -> int:
-        return random.randint(self.min_value, self.max_value)
+        low = self.min_value
+        span = self.max_value - low + 1
+        if span <= 0:
+            # Let randint raise its usual error for an empty range
+            return self._rng.randint(low, self.max_value)
+        getrandbits = self._rng.getrandbits
+        if not span & (span - 1):
+            # Power-of-two spans are covered exactly by span - 1 bits, never rejecting
+            return low + getrandbits(span.bit_length() - 1)
+        # Otherwise the rejection loop random.randint runs, minus its argument checks
+        bits = span.bit_length()
+        value = getrandbits(bits)
+        while value >= span:
+            value = getrandbits(bits)
+        return low + value
+
+    def generate_batch(self, n: int) -> list[int]:
+        values = range(self.min_value, self.max_value + 1)
+        # random.choices indexes by floor(random() * len), which skews some values
+        # by about len / 2**53; past 2**32 values that skew is no longer negligible,
+        # so wider spans draw each value exactly via generate()
+        # An empty range goes through generate() too, which raises randint's ValueError
+        if len(values) > 2**32 or not values:
+            return super().generate_batch(n)
+        return self._rng.choices(values, k=n)
 
 
 class FloatStrategy(Strategy[float]):
     """Strategy for generating floats."""
 
+    __slots__ = ()
+
     def __init__(self, min_value: float | None = None, max_value: float | None = None):
         super().__init__(min_value, max_value)
         self.min_value: float = min_value if min_value is not None else -1000.0
         self.max_value: float = max_value if max_value is not None else 1000.0
 
     def generate(self) -> float:
-        return random.uniform(self.min_value, self.max_value)
+        return self._rng.uniform(self.min_value, self.max_value)
+
+    def generate_batch(self, n: int) -> list[float]:
+        # Same formula as random.uniform, without a method call per value
+        low = self.min_value
+        width = self.max_value - low
+        rand = self._rng.random
+        return [low + width * rand() for _ in range(n)]
 
 
 class StringStrategy(Strategy[str]):
     """Strategy for generating strings."""
 
+    __slots__ = ("_byte_table", "alphabet", "max_length", "min_length")
+
     def __init__(self, min_length: int = 0, max_length: int = 100, alphabet: str | None = None):
         super().__init__()
         self.min_length = min_length
         self.max_length = max_length
-        self.alphabet = alphabet or string.ascii_letters + string.digits + string.punctuation
+        self.alphabet = alphabet or _DEFAULT_ALPHABET
+        self._byte_table = _ascii_byte_table(self.alphabet)
 
     def generate(self) -> str:
-        length = random.randint(self.min_length, self.max_length)
-        return "".join(random.choices(self.alphabet, k=length))
+        length = self._rng.randint(self.min_length, self.max_length)
+        if self._byte_table is None:
+            return "".join(self._rng.choices(self.alphabet, k=length))
+
+        # Map random bytes straight onto the alphabet; power-of-two alphabets
+        # never reject a byte, so they need exactly one draw
+        table, rejected = self._byte_table
+        if not rejected:
+            return self._rng.randbytes(length).translate(table).decode("ascii")
+
+        # Otherwise top up after rejections, growing a single buffer in place
+        chars = bytearray()
+        while len(chars) < length:
+            chars += self._rng.randbytes(length - len(chars)).translate(table, rejected)
+        return chars.decode("ascii")
+
+    def generate_batch(self, n: int) -> list[str]:
+        # Non-ASCII alphabets and empty length ranges (randint's ValueError) go
+        # through generate()
+        if self._byte_table is None or self.min_length > self.max_length:
+            return super().generate_batch(n)
+
+        # Draw every length first, then all characters as one buffer sliced apart
+        rng = self._rng
+        lengths = rng.choices(range(self.min_length, self.max_length + 1), k=n)
+        total = sum(lengths)
+        table, rejected = self._byte_table
+        if not rejected:
+            text = rng.randbytes(total).translate(table).decode("ascii")
+        else:
+            chars = bytearray()
+            while len(chars) < total:
+                chars += rng.randbytes(total - len(chars)).translate(table, rejected)
+            text = chars.decode("ascii")
+
+        values = []
+        start = 0
+        for length in lengths:
+            end = start + length
+            values.append(text[start:end])
+            start = end
+        return values
 
 
 class BooleanStrategy(Strategy[bool]):
     """Strategy for generating booleans."""
 
+    __slots__ = ()
+
     def generate(self) -> bool:
-        return random.choice([True, False])
+        return self._rng.getrandbits(1) == 1
+
+    def generate_batch(self, n: int) -> list[bool]:
+        if n <= 0:
+            return []
+        # One n-bit draw for the whole batch, read back through its binary digits
+        return [bit == "1" for bit in f"{self._rng.getrandbits(n):0{n}b}"]
 
 
 class ListStrategy(Strategy[list[Any]]):
     """Strategy for generating lists."""
 
+    __slots__ = ("element_strategy", "max_length", "min_length")
+
     def __init__(self, element_strategy: Strategy[Any], min_length: int = 0, max_length: int = 10):
         super().__init__()
         self.element_strategy = element_strategy
@@ -116,19 +352,41 @@ class ListStrategy(Strategy[list[Any]]):
         self.max_length = max_length
 
     def generate(self) -> list[Any]:
-        length = random.randint(self.min_length, self.max_length)
-        return [self.element_strategy.generate() for _ in range(length)]
+        length = self._rng.randint(self.min_length, self.max_length)
+        # Numeric and choice elements come from a single bulk draw
+        return self.element_strategy.generate_batch(length)
+
+    def generate_batch(self, n: int) -> list[list[Any]]:
+        if self.min_length > self.max_length:
+            # generate() raises randint's ValueError for the empty length range
+            return super().generate_batch(n)
+
+        # Draw every length, then the elements of all n lists in one bulk draw
+        lengths = self._rng.choices(range(self.min_length, self.max_length + 1), k=n)
+        elements = self.element_strategy.generate_batch(sum(lengths))
+        values = []
+        start = 0
+        for length in lengths:
+            end = start + length
+            values.append(elements[start:end])
+            start = end
+        return values
 
 
 class ChoiceStrategy(Strategy[Any]):
     """Strategy for choosing from a set of values."""
 
+    __slots__ = ("choices",)
+
     def __init__(self, choices: list[Any]):
         super().__init__()
         self.choices = choices
 
     def generate(self) -> Any:
-        return random.choice(self.choices)
+        return self._rng.choice(self.choices)
+
+    def generate_batch(self, n: int) -> list[Any]:
+        return self._rng.choices(self.choices, k=n)
 
 
 # Convenience functions for creating strategies
@@ -164,3 +422,26 @@ def lists(
 def choices(choices: list[Any]) -> ChoiceStrategy:
     """Create a choice strategy."""
     return ChoiceStrategy(choices)
+
+
+@contextmanager
+def _seeded_generators(strategies: Sequence[Strategy[Any]], seed: int) -> Iterator[None]:
+    """
+    Give each strategy its own generator, seeded with seed plus its position.
+
+    The strategies' previous generators are put back on exit, so callers'
+    strategies keep drawing from whatever they used before.
+    """
+    # Subclasses that skip Strategy.__init__ have no generator of their own yet
+    previous = [getattr(strat, "_rng", None) for strat in strategies]
+    for offset, strat in enumerate(strategies):
+        strat.seed(seed + offset)
+    try:
+        yield
+    finally:
+        # In reverse, so a strategy passed twice ends up with its original generator
+        for strat, rng in reversed(list(zip(strategies, previous, strict=True))):
+            if rng is None:
+                del strat._rng
+            else:
+                strat._rng = rng
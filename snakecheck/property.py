@@ -2,11 +2,59 @@
 Property-based testing utilities for SnakeCheck.
 """
 
+import multiprocessing
+import random
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Any
 
-from .generators import Strategy
+from .core import _fails
+from .generators import Strategy, _seeded_generators
+
+# Examples PropertyTest generates per bulk draw from each strategy
+_EXAMPLE_CHUNK_SIZE = 10
+
+# Halving step for each numeric type _shrink_example shrinks, keyed on the exact type
+_HALVE: dict[type, Callable[[Any], float]] = {
+    int: lambda value: value // 2,
+    float: lambda value: value / 2,
+}
+
+# A property to check in worker processes: (func, strategies, args, kwargs)
+_WorkerTask = tuple[Callable[..., Any], tuple[Strategy[Any], ...], tuple[Any, ...], dict[str, Any]]
+
+# Set in each worker process by _init_worker
+_worker_task: _WorkerTask
+
+
+def _init_worker(task: _WorkerTask) -> None:
+    global _worker_task
+    _worker_task = task
+
+
+def _seeded_example(strategies: tuple[Strategy[Any], ...], seed: int) -> list[Any]:
+    """
+    Generate the data for one example, reproducibly from seed.
+
+    Top-level strategies draw from their own generators seeded from seed, and
+    nested ones from the shared generator seeded with it. Both the shared
+    generator's state and the strategies' generators are restored afterwards.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        with _seeded_generators(strategies, seed):
+            return [strat.generate() for strat in strategies]
+    finally:
+        random.setstate(state)
+
+
+def _example_passes(seed: int) -> bool:
+    """Run the worker's property on one seeded example."""
+    func, strategies, args, kwargs = _worker_task
+    return not _fails(func, _seeded_example(strategies, seed), args, kwargs)
 
 
 class PropertyTest:
@@ -18,11 +66,19 @@ class PropertyTest:
         timeout: float | None = None,
         seed: int | None = None,
         verbose: bool = True,
+        max_shrinks: int = 500,
+        shrink_timeout: float | None = None,
+        workers: int = 1,
     ):
         self.max_examples = max_examples
         self.timeout = timeout
         self.seed = seed
         self.verbose = verbose
+        # Budget for test calls while shrinking a failure
+        self.max_shrinks = max_shrinks
+        self.shrink_timeout = shrink_timeout
+        # Processes to check examples in; only used where processes can be forked
+        self.workers = workers
         self.examples_tried: int = 0
         self.examples_failed: int = 0
         self.start_time: float | None = None
@@ -41,7 +97,24 @@ class PropertyTest:
                 if self.verbose:
                     print(f"Running property test with {self.max_examples} examples...")
 
-                for i in range(self.max_examples):
+                # With several workers, each example comes from its own seed; the
+                # workers check them all and only the first failure is replayed here
+                seeds = None
+                if self.workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+                    seed_rng = random.Random(self.seed)
+                    seeds = [seed_rng.getrandbits(64) for _ in range(self.max_examples)]
+                    self.examples_tried = self._count_passing_in_workers(
+                        func, strategies, args, kwargs, seeds
+                    )
+
+                start = self.examples_tried
+                if seeds is None:
+                    examples = self._example_stream(strategies, self.max_examples - start)
+                else:
+                    examples = (_seeded_example(strategies, seed) for seed in seeds[start:])
+
+                result = None
+                for i, test_data in enumerate(examples, start):
                     # Check timeout
                     if (
                         self.timeout
@@ -53,8 +126,6 @@ class PropertyTest:
                         break
 
                     try:
-                        # Generate test data
-                        test_data = [strat.generate() for strat in strategies]
                         self.examples_tried += 1
 
                         # Run the test
@@ -66,11 +137,11 @@ class PropertyTest:
                     except Exception as e:
                         self.examples_failed += 1
                         if self.verbose:
-                            print(f"  ✗ Example {i + 1} failed: {test_data}")
+                            print(f"  ✗ Example {i + 1} failed: {list(test_data)}")
                             print(f"    Error: {e}")
 
                         # Try to shrink the failing example
-                        shrunk = self._shrink_example(func, test_data, args, kwargs, e)
+                        shrunk = self._shrink_example(func, list(test_data), args, kwargs, e)
                         if shrunk and self.verbose:
                             print(f"    Minimal failing example: {shrunk}")
 
@@ -93,6 +164,62 @@ class PropertyTest:
 
         return decorator
 
+    def _example_stream(
+        self, strategies: tuple[Strategy[Any], ...], count: int
+    ) -> Iterator[Sequence[Any]]:
+        """
+        Yield the data for count examples, drawn in bulk a chunk at a time.
+
+        Each chunk takes one generate_batch call per strategy, while the
+        timeout is still checked between examples.
+        """
+        while count > 0:
+            size = min(_EXAMPLE_CHUNK_SIZE, count)
+            if strategies:
+                yield from zip(*[strat.generate_batch(size) for strat in strategies], strict=True)
+            else:
+                yield from repeat((), size)
+            count -= size
+
+    def _count_passing_in_workers(
+        self,
+        func: Callable[..., Any],
+        strategies: tuple[Strategy[Any], ...],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        seeds: list[int],
+    ) -> int:
+        """
+        Check the seeded examples in forked worker processes.
+
+        Returns how many examples passed before the first failure (or the
+        timeout). Forked workers inherit the property instead of pickling it,
+        so only seeds and results cross between processes.
+        """
+        passed = 0
+        executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=((func, strategies, args, kwargs),),
+        )
+        chunksize = max(1, len(seeds) // (4 * self.workers))
+        try:
+            for ok in executor.map(_example_passes, seeds, chunksize=chunksize):
+                if not ok or (
+                    self.timeout
+                    and self.start_time
+                    and time.time() - self.start_time > self.timeout
+                ):
+                    break
+                passed += 1
+                if self.verbose and passed % 10 == 0:
+                    print(f"  ✓ Example {passed}/{self.max_examples} passed")
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        return passed
+
     def _shrink_example(
         self,
         func: Callable[..., Any],
@@ -107,35 +234,43 @@ class PropertyTest:
 
         shrunk_data = failing_data.copy()
         improved = True
+        attempts = 0
+        deadline = time.time() + self.shrink_timeout if self.shrink_timeout is not None else None
 
         while improved:
             improved = False
 
             for i, value in enumerate(shrunk_data):
-                if isinstance(value, int | float):
-                    # Try smaller values
-                    if isinstance(value, int) and value != 0:
-                        test_value_int: int = value // 2
-                        test_data = shrunk_data.copy()
-                        test_data[i] = test_value_int
-                    elif isinstance(value, float) and value != 0.0:
-                        test_value_float: float = value / 2
-                        test_data = shrunk_data.copy()
-                        test_data[i] = test_value_float
+                if attempts >= self.max_shrinks or (
+                    deadline is not None and time.time() > deadline
+                ):
+                    if self.verbose:
+                        print(f"    Stopped shrinking after {attempts} attempts")
+                    return shrunk_data if shrunk_data != failing_data else None
+
+                # Try smaller values
+                halve = _HALVE.get(type(value))
+                if halve is None:
+                    # Subclasses such as bool miss the exact-type table
+                    if isinstance(value, int):
+                        halve = _HALVE[int]
+                    elif isinstance(value, float):
+                        halve = _HALVE[float]
                     else:
                         continue
+                if value == 0:
+                    continue
+                test_value = halve(value)
 
-                    try:
-                        func(*test_data, *args, **kwargs)
-                        # If this passes, we can't shrink further
-                        continue
-                    except Exception:
-                        # This still fails, keep the smaller value
-                        if isinstance(value, int):
-                            shrunk_data[i] = test_value_int
-                        else:
-                            shrunk_data[i] = test_value_float
-                        improved = True
+                # Swap the candidate in place, restoring the old value if the test passes
+                attempts += 1
+                shrunk_data[i] = test_value
+                if _fails(func, shrunk_data, args, kwargs):
+                    # This still fails, keep the smaller value
+                    improved = True
+                else:
+                    # If this passes, we can't shrink further
+                    shrunk_data[i] = value
 
         return shrunk_data if shrunk_data != failing_data else None
 
@@ -5,19 +5,43 @@ This module implements shrinking algorithms that understand the relationships
 between generated values, enabling more intelligent shrinking strategies.
 """
 
-from collections.abc import Callable
-from typing import Any
+import time
+from collections import Counter
+from collections.abc import Callable, Hashable
+from dataclasses import replace
+from functools import cached_property
+from typing import Any, ClassVar
 
 from .trace import GenerationTrace, TraceEntry
 
+# Most test outcomes a shrinker remembers at once
+_MAX_CACHED_RESULTS = 4096
+
 
 class DataflowAwareShrinker:
     """A shrinking algorithm that understands dataflow dependencies."""
 
-    def __init__(self, trace: GenerationTrace):
+    def __init__(
+        self, trace: GenerationTrace, max_shrinks: int = 500, shrink_timeout: float | None = None
+    ):
         self.trace = trace
-        self.dependency_graph = trace.get_dependency_graph()
-        self.reverse_dependencies = trace.get_reverse_dependencies()
+        # Budget for test calls per shrink, so pathological properties can't hang
+        self.max_shrinks = max_shrinks
+        self.shrink_timeout = shrink_timeout
+        self.shrinks_tried: int = 0
+        self._deadline: float | None = None
+        # Test outcomes by candidate value, for this shrink run
+        self._results: dict[Hashable, bool] = {}
+
+    @cached_property
+    def dependency_graph(self) -> dict[str, set[str]]:
+        """Dependency graph of the original trace, built on first use."""
+        return self.trace.get_dependency_graph()
+
+    @cached_property
+    def reverse_dependencies(self) -> dict[str, set[str]]:
+        """Reverse dependency graph of the original trace, built on first use."""
+        return self.trace.get_reverse_dependencies()
 
     def shrink_failing_example(
         self, test_func: Callable[[Any], bool]
@@ -31,6 +55,13 @@ class DataflowAwareShrinker:
         Returns:
             Tuple of (shrunk_value, shrunk_trace)
         """
+        self.shrinks_tried = 0
+        self._results.clear()
+        # Recount dependents from the original trace on next use
+        vars(self).pop("_dependents_count", None)
+        if self.shrink_timeout is not None:
+            self._deadline = time.time() + self.shrink_timeout
+
         current_trace = self.trace
         current_value = self._reconstruct_value(current_trace)
 
@@ -52,6 +83,9 @@ class DataflowAwareShrinker:
             current_trace = shrunk_trace
             current_value = self._reconstruct_value(current_trace)
 
+        if self._budget_exhausted():
+            print(f"    Stopped shrinking after {self.shrinks_tried} attempts")
+
         return current_value, current_trace
 
     def _reconstruct_value(self, trace: GenerationTrace) -> Any:
@@ -64,25 +98,103 @@ class DataflowAwareShrinker:
         self, trace: GenerationTrace, test_func: Callable[[Any], bool]
     ) -> GenerationTrace | None:
         """Try to shrink individual values while preserving dependencies."""
-        shrunk_trace = trace
-
         # Sort entries by dependency depth (leaves first)
         sorted_entries = self._sort_by_dependency_depth(trace.entries)
 
         for entry in sorted_entries:
-            # Try to shrink this value
-            shrunk_value = self._try_shrink_value(entry.value, entry.strategy)
+            # Search for the smallest value that still fails
+            fails = self._value_oracle(trace, entry.id, test_func)
+            shrunk_value = self._minimize_value(entry.value, fails)
             if shrunk_value != entry.value:
-                # Create new trace with shrunk value
-                new_trace = self._create_modified_trace(trace, entry.id, shrunk_value)
+                print(f"    Shrunk {entry.id} from {entry.value} to {shrunk_value}")
+                return self._create_modified_trace(trace, entry.id, shrunk_value)
 
-                # Test if the shrunk value still fails
-                if self._test_trace(new_trace, test_func):
-                    shrunk_trace = new_trace
-                    print(f"    Shrunk {entry.id} from {entry.value} to {shrunk_value}")
+        return None
+
+    def _value_oracle(
+        self, trace: GenerationTrace, entry_id: str, test_func: Callable[[Any], bool]
+    ) -> Callable[[Any], bool]:
+        """Build a predicate telling whether the trace still fails with entry_id set to a value."""
+
+        def fails(value: Any) -> bool:
+            return self._test_trace(self._create_modified_trace(trace, entry_id, value), test_func)
+
+        return fails
+
+    def _minimize_value(self, value: Any, fails: Callable[[Any], bool]) -> Any:
+        """Find a smaller value for which fails() still holds, or return value itself."""
+        if isinstance(value, int):
+            return self._minimize_int(value, fails)
+        elif isinstance(value, str):
+            return self._ddmin(value, fails)
+        elif isinstance(value, list):
+            return self._shrink_numeric_elements(self._ddmin(value, fails), fails)
+
+        return value
+
+    def _minimize_int(self, value: int, fails: Callable[[int], bool]) -> int:
+        """Binary search toward 0 for the smallest magnitude that still fails."""
+        if value == 0:
+            return value
+        if fails(0):
+            return 0
+
+        # Magnitude lo passes (or is 0) and hi fails; narrow until they are adjacent
+        sign = 1 if value > 0 else -1
+        lo, hi = 0, abs(value)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if fails(sign * mid):
+                hi = mid
+            else:
+                lo = mid
+
+        return sign * hi
+
+    def _ddmin(self, value: Any, fails: Callable[[Any], bool]) -> Any:
+        """
+        Delta-debugging minimization of a string or list.
+
+        Tries removing each of n chunks; a removal that still fails is kept and
+        n drops by one, otherwise the chunks are halved. The result is
+        1-minimal: removing any single element makes the test pass.
+        """
+        n = 2
+        while len(value) >= 2:
+            chunk_size = -(-len(value) // n)
+            for start in range(0, len(value), chunk_size):
+                complement = value[:start] + value[start + chunk_size :]
+                if fails(complement):
+                    value = complement
+                    n = max(n - 1, 2)
                     break
+            else:
+                if n >= len(value):
+                    break
+                n = min(len(value), 2 * n)
+
+        return value
+
+    def _shrink_numeric_elements(self, value: list[Any], fails: Callable[[Any], bool]) -> list[Any]:
+        """
+        Shrink every element of a list of ints and floats at once.
+
+        Tries zeroing the whole list first, then repeatedly halves every element
+        toward 0 (floor division of the magnitude, so negatives reach 0 too)
+        while the test still fails.
+        """
+        if not value or not all(type(x) is int or type(x) is float for x in value):
+            return value
+
+        zeros = [x * 0 for x in value]
+        if zeros != value and fails(zeros):
+            return zeros
 
-        return shrunk_trace if shrunk_trace != trace else None
+        while True:
+            halved = [x // 2 if x >= 0 else -(-x // 2) for x in value]
+            if halved == value or not fails(halved):
+                return value
+            value = halved
 
     def _shrink_dependency_chains(
         self, trace: GenerationTrace, test_func: Callable[[Any], bool]
@@ -112,7 +224,9 @@ class DataflowAwareShrinker:
 
         # Try to shrink the root values
         for root_id in root_ids:
-            entry = next(e for e in trace.entries if e.id == root_id)
+            entry = trace.get_entry(root_id)
+            if entry is None:
+                continue
             shrunk_value = self._try_shrink_value(entry.value, entry.strategy)
 
             if shrunk_value != entry.value:
@@ -130,20 +244,45 @@ class DataflowAwareShrinker:
     ) -> GenerationTrace | None:
         """Try to shrink by removing optional dependencies."""
         # Find entries that might be optional (have many dependents but few dependencies)
+        dependents_count = self._dependents_count
         for entry in trace.entries:
-            dependents = self.reverse_dependencies.get(entry.id, set())
-
-            if len(dependents) > 1 and len(entry.dependencies) <= 1:
+            if dependents_count[entry.id] > 1 and len(entry.dependencies) <= 1:
                 # This might be optional - try removing it
                 new_trace = self._remove_entry(trace, entry.id)
                 if new_trace and self._test_trace(new_trace, test_func):
                     print(f"    Removed optional entry {entry.id} with value {entry.value}")
-                    return new_trace
+                    return self._accept(new_trace, entry.id)
 
         return None
 
+    @cached_property
+    def _dependents_count(self) -> Counter[str]:
+        """Number of entries depending on each entry, kept current as entries are removed."""
+        return Counter({tid: len(deps) for tid, deps in self.reverse_dependencies.items()})
+
+    def _accept(self, new_trace: GenerationTrace, removed_id: str) -> GenerationTrace:
+        """
+        Record that new_trace, made by removing removed_id, replaces the current trace.
+
+        Updates the dependents counts in place instead of rebuilding reverse dependencies.
+
+        Returns:
+            new_trace, for chaining
+        """
+        dependents_count = self._dependents_count
+        for dep in self.dependency_graph.get(removed_id, ()):
+            if dependents_count[dep] > 0:
+                dependents_count[dep] -= 1
+        dependents_count.pop(removed_id, None)
+        return new_trace
+
     def _try_shrink_value(self, value: Any, strategy: Any) -> Any:
         """Try to shrink a single value."""
+        shrink = self._VALUE_SHRINKERS.get(type(value))
+        if shrink is not None:
+            return shrink(self, value)
+
+        # Subclasses such as bool miss the exact-type table
         if isinstance(value, int):
             return self._try_shrink_int(value)
         elif isinstance(value, str):
@@ -155,106 +294,115 @@ class DataflowAwareShrinker:
 
     def _try_shrink_int(self, value: int) -> int:
         """Try to shrink an integer value."""
-        if value > 0:
-            # Try to reduce by half, but ensure we don't go below 0
-            shrunk_value = max(0, value // 2)
-            if shrunk_value != value:
-                return shrunk_value
-        elif value < 0:
-            # Try to reduce negative values by half
-            shrunk_value = value // 2
-            if shrunk_value != value:
-                return shrunk_value
-
-        return value
+        # Floor halving moves toward 0 and leaves 0 and -1 unchanged
+        return value // 2
 
     def _try_shrink_str(self, value: str) -> str:
         """Try to shrink a string value."""
-        if len(value) > 1:
-            shrunk_value = value[: len(value) // 2]
-            if shrunk_value != value:
-                return shrunk_value
-
-        return value
+        # Keep the first half; strings of length 0 or 1 stay unchanged
+        return value[: len(value) // 2] if len(value) > 1 else value
 
     def _try_shrink_list(self, value: list[Any]) -> list[Any]:
         """Try to shrink a list value."""
-        if len(value) > 1:
-            shrunk_value = value[: len(value) // 2]
-            if shrunk_value != value:
-                return shrunk_value
+        return value[: len(value) // 2] if len(value) > 1 else value
 
-        return value
+    # Per-value shrinkers for _try_shrink_value, keyed on the exact type
+    _VALUE_SHRINKERS: ClassVar[dict[type, Callable[[Any, Any], Any]]] = {
+        int: _try_shrink_int,
+        str: _try_shrink_str,
+        list: _try_shrink_list,
+    }
 
     def _sort_by_dependency_depth(self, entries: list[TraceEntry]) -> list[TraceEntry]:
         """Sort entries by dependency depth (leaves first)."""
-
-        def get_depth(entry_id: str, visited: set[str] | None = None) -> int:
-            if visited is None:
-                visited = set()
-
-            if entry_id in visited:
-                return 0
-
-            visited.add(entry_id)
-            deps = self.dependency_graph.get(entry_id, set())
-
-            if not deps:
-                return 0
-
-            return 1 + max(get_depth(dep, visited) for dep in deps)
-
-        return sorted(entries, key=lambda e: get_depth(e.id))
+        depths = self.trace.get_dependency_depths()
+        return sorted(entries, key=lambda e: depths.get(e.id, 0))
 
     def _create_modified_trace(
         self, trace: GenerationTrace, entry_id: str, new_value: Any
     ) -> GenerationTrace:
-        """Create a new trace with a modified entry value."""
-        from copy import deepcopy
-
-        new_trace = deepcopy(trace)
+        """
+        Create a new trace with a modified entry value.
 
-        # Update the entry value
-        for entry in new_trace.entries:
+        Only the modified entry is rebuilt; every other entry (and its
+        strategy) is shared with the original trace.
+        """
+        entries = trace.entries.copy()
+        for i, entry in enumerate(entries):
             if entry.id == entry_id:
-                entry.value = new_value
+                entries[i] = replace(entry, value=new_value)
                 break
 
-        return new_trace
+        return GenerationTrace(entries, trace.variable_assignments.copy(), trace._next_id)
 
     def _remove_entry(self, trace: GenerationTrace, entry_id: str) -> GenerationTrace | None:
-        """Remove an entry from the trace."""
-        from copy import deepcopy
-
-        new_trace = deepcopy(trace)
-
-        # Remove the entry
-        new_trace.entries = [e for e in new_trace.entries if e.id != entry_id]
+        """Remove an entry from the trace, rebuilding only the entries that depended on it."""
+        entries = [
+            replace(e, dependencies=[dep for dep in e.dependencies if dep != entry_id])
+            if entry_id in e.dependencies
+            else e
+            for e in trace.entries
+            if e.id != entry_id
+        ]
 
         # Remove from variable assignments
-        new_trace.variable_assignments = {
-            var: tid for var, tid in new_trace.variable_assignments.items() if tid != entry_id
+        variable_assignments = {
+            var: tid for var, tid in trace.variable_assignments.items() if tid != entry_id
         }
 
-        # Update dependencies
-        for entry in new_trace.entries:
-            entry.dependencies = [dep for dep in entry.dependencies if dep != entry_id]
+        return GenerationTrace(entries, variable_assignments, trace._next_id)
 
-        return new_trace
+    def _budget_exhausted(self) -> bool:
+        """Whether the shrink attempt or time budget has run out."""
+        return self.shrinks_tried >= self.max_shrinks or (
+            self._deadline is not None and time.time() > self._deadline
+        )
 
     def _test_trace(self, trace: GenerationTrace, test_func: Callable[[Any], bool]) -> bool:
-        """Test if a trace still produces a failing example."""
+        """
+        Test if a trace still produces a failing example.
+
+        Once the budget is exhausted every candidate counts as passing, so all
+        shrink passes stop at the best trace found so far.
+        """
+        if self._budget_exhausted():
+            return False
+
+        value = self._reconstruct_value(trace)
+        # Identical candidates are only tested once; values that can't be
+        # hashed are always tested. The key follows trace order, so no sort is needed
+        key: Hashable | None = tuple(value.items())
+        try:
+            cached = self._results.pop(key, None)
+        except TypeError:
+            key = None
+        else:
+            if cached is not None:
+                # Reinsert to mark the result as recently used
+                self._results[key] = cached
+                return cached
+        self.shrinks_tried += 1
+
         try:
-            value = self._reconstruct_value(trace)
             # We want the test to FAIL (raise an exception) for shrinking to work
             test_func(value)
-            return False  # Test passed, so this is not a failing example
+            fails = False  # Test passed, so this is not a failing example
         except Exception:
-            return True  # Test failed, so this is still a failing example
+            fails = True  # Test failed, so this is still a failing example
+
+        if key is not None:
+            if len(self._results) >= _MAX_CACHED_RESULTS:
+                # Evict the least recently used result
+                del self._results[next(iter(self._results))]
+            self._results[key] = fails
+        return fails
 
 
 def shrink_with_dataflow(
-    trace: GenerationTrace, test_func: Callable[[Any], bool]
+    trace: GenerationTrace,
+    test_func: Callable[[Any], bool],
+    max_shrinks: int = 500,
+    shrink_timeout: float | None = None,
 ) -> tuple[Any, GenerationTrace]:
     """
     Shrink a failing example using dataflow-aware shrinking.
@@ -262,9 +410,11 @@ def shrink_with_dataflow(
     Args:
         trace: The generation trace to shrink
         test_func: Function that tests if a value is valid
+        max_shrinks: Maximum number of test calls to spend on shrinking
+        shrink_timeout: Optional wall-clock limit on shrinking, in seconds
 
     Returns:
         Tuple of (shrunk_value, shrunk_trace)
     """
-    shrinker = DataflowAwareShrinker(trace)
+    shrinker = DataflowAwareShrinker(trace, max_shrinks, shrink_timeout)
     return shrinker.shrink_failing_example(test_func)
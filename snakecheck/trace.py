@@ -5,15 +5,17 @@ This module provides a way to trace the generation of values and their dependenc
 enabling dataflow-aware shrinking algorithms.
 """
 
+from array import array
+from collections.abc import Callable, Hashable
 from dataclasses import dataclass, field
 from typing import Any
 
 from .generators import Strategy
 
 
-@dataclass
+@dataclass(slots=True)
 class TraceEntry:
-    """A single entry in the generation trace."""
+    """A single entry in the generation trace; slotted, since traces hold one per draw."""
 
     id: str
     strategy: Strategy[Any]
@@ -27,8 +29,15 @@ class GenerationTrace:
     """A complete trace of value generation with dependencies."""
 
     entries: list[TraceEntry] = field(default_factory=list)
-    variable_assignments: dict[str, str] = field(default_factory=dict)  # var_name -> trace_id
+    # var_name -> trace_id; names may be any hashable key, e.g. ("element", i, j)
+    variable_assignments: dict[Hashable, str] = field(default_factory=dict)
     _next_id: int = 0
+    # Memoized dependency queries; cleared whenever the trace is mutated
+    _cache: dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def invalidate(self) -> None:
+        """Drop memoized dependency queries; call after mutating entries directly."""
+        self._cache.clear()
 
     def add_entry(
         self, strategy: Strategy[Any], value: Any, dependencies: list[str] | None = None
@@ -37,29 +46,58 @@ class GenerationTrace:
         trace_id = f"t{self._next_id}"
         self._next_id += 1
 
-        entry = TraceEntry(
-            id=trace_id, strategy=strategy, value=value, dependencies=dependencies or []
-        )
-
-        self.entries.append(entry)
+        self.entries.append(TraceEntry(trace_id, strategy, value, dependencies or []))
+        # Nothing is memoized while a trace is being generated, so skip the call
+        if self._cache:
+            self._cache.clear()
         return trace_id
 
-    def assign_variable(self, var_name: str, trace_id: str) -> None:
+    def assign_variable(self, var_name: Hashable, trace_id: str) -> None:
         """Record a variable assignment."""
         self.variable_assignments[var_name] = trace_id
+        if self._cache:
+            self._cache.clear()
+
+    def get_entry(self, trace_id: str) -> TraceEntry | None:
+        """Look up the entry with the given ID, or None if there is none."""
+        entries_by_id: dict[str, TraceEntry] | None = self._cache.get("entries_by_id")
+        if entries_by_id is None:
+            entries_by_id = {}
+            for entry in self.entries:
+                # Keep the first entry for an ID, as a linear scan would find
+                entries_by_id.setdefault(entry.id, entry)
+            self._cache["entries_by_id"] = entries_by_id
+        return entries_by_id.get(trace_id)
 
     def get_dependency_graph(self) -> dict[str, set[str]]:
-        """Build a dependency graph from the trace."""
+        """
+        Build a dependency graph from the trace.
+
+        The graph is memoized until the trace is next mutated, so treat it as read-only.
+        """
+        graph: dict[str, set[str]] | None = self._cache.get("dependency_graph")
+        if graph is not None:
+            return graph
+
         graph = {}
 
         for entry in self.entries:
             graph[entry.id] = set(entry.dependencies)
 
+        self._cache["dependency_graph"] = graph
         return graph
 
     def get_reverse_dependencies(self) -> dict[str, set[str]]:
-        """Get reverse dependencies (what depends on each value)."""
-        reverse: dict[str, set[str]] = {}
+        """
+        Get reverse dependencies (what depends on each value).
+
+        The mapping is memoized until the trace is next mutated, so treat it as read-only.
+        """
+        reverse: dict[str, set[str]] | None = self._cache.get("reverse_dependencies")
+        if reverse is not None:
+            return reverse
+
+        reverse = {}
 
         for entry in self.entries:
             for dep_id in entry.dependencies:
@@ -67,94 +105,264 @@ class GenerationTrace:
                     reverse[dep_id] = set()
                 reverse[dep_id].add(entry.id)
 
+        self._cache["reverse_dependencies"] = reverse
         return reverse
 
-    def get_connected_components(self) -> list[set[str]]:
-        """Find connected components in the dependency graph."""
-        visited = set()
-        components = []
+    def _index_graph(self) -> tuple[list[str], array[int], array[int]]:
+        """
+        Number every trace ID and return the dependency graph in CSR form.
 
-        def dfs(node_id: str, component: set[str]) -> None:
-            if node_id in visited:
-                return
+        Returns (ids, indptr, indices): the dependencies of entry i are
+        indices[indptr[i]:indptr[i + 1]], as positions into ids. Dependencies
+        that are not entries of this trace are numbered after the entries.
+        The result is memoized until the trace is next mutated.
+        """
+        cached: tuple[list[str], array[int], array[int]] | None = self._cache.get("csr")
+        if cached is not None:
+            return cached
 
-            visited.add(node_id)
-            component.add(node_id)
+        ids = [entry.id for entry in self.entries]
+        index = {trace_id: i for i, trace_id in enumerate(ids)}
+        indptr = array("i", [0])
+        indices = array("i")
 
-            # Find the entry for this node
-            entry = next((e for e in self.entries if e.id == node_id), None)
-            if entry:
-                # Visit dependencies
-                for dep_id in entry.dependencies:
-                    dfs(dep_id, component)
+        for entry in self.entries:
+            for dep_id in entry.dependencies:
+                if dep_id not in index:
+                    index[dep_id] = len(ids)
+                    ids.append(dep_id)
+                indices.append(index[dep_id])
+            indptr.append(len(indices))
 
-                # Visit reverse dependencies
-                reverse_deps = self.get_reverse_dependencies()
-                for rev_dep_id in reverse_deps.get(node_id, []):
-                    dfs(rev_dep_id, component)
+        self._cache["csr"] = ids, indptr, indices
+        return ids, indptr, indices
 
-        for entry in self.entries:
-            if entry.id not in visited:
-                component: set[str] = set()
-                dfs(entry.id, component)
-                components.append(component)
+    def get_connected_components(self) -> list[set[str]]:
+        """Find connected components in the dependency graph."""
+        ids, indptr, indices = self._index_graph()
+        entry_count = len(self.entries)
+
+        # Union-find over entry positions, with path halving
+        parent = array("i", range(entry_count))
+
+        def find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for node in range(entry_count):
+            for dep in indices[indptr[node] : indptr[node + 1]]:
+                if dep < entry_count:
+                    root, dep_root = find(node), find(dep)
+                    if root != dep_root:
+                        parent[max(root, dep_root)] = min(root, dep_root)
+
+        # Bucket entries by root, numbering components in order of their first entry
+        components: list[set[str]] = []
+        component_of = array("i", [0]) * entry_count
+        slot_by_root: dict[int, int] = {}
+        for node in range(entry_count):
+            root = find(node)
+            slot = slot_by_root.get(root)
+            if slot is None:
+                slot = slot_by_root[root] = len(components)
+                components.append(set())
+            components[slot].add(ids[node])
+            component_of[node] = slot
+
+        # IDs without an entry don't connect anything; each joins the earliest
+        # component that references it
+        dangling_slots: dict[int, int] = {}
+        for node in range(entry_count):
+            for dep in indices[indptr[node] : indptr[node + 1]]:
+                if dep >= entry_count:
+                    slot = component_of[node]
+                    if slot < dangling_slots.get(dep, slot + 1):
+                        dangling_slots[dep] = slot
+        for dep, slot in dangling_slots.items():
+            components[slot].add(ids[dep])
 
         return components
 
-    def get_variable_dependencies(self, var_name: str) -> set[str]:
+    def get_dependency_depths(self) -> dict[str, int]:
+        """
+        Map each entry ID to the length of its longest dependency path.
+
+        Computed in one post-order walk over the CSR graph and memoized until
+        the trace is next mutated. A dependency that is still on the current
+        path closes a cycle and counts as depth 0, as do IDs without an entry.
+        """
+        cached: dict[str, int] | None = self._cache.get("depths")
+        if cached is not None:
+            return cached
+
+        ids, indptr, indices = self._index_graph()
+        entry_count = len(self.entries)
+        depths = [-1] * entry_count  # -1 until computed
+        on_path = bytearray(entry_count)
+
+        for start in range(entry_count):
+            if depths[start] >= 0:
+                continue
+            on_path[start] = 1
+            stack = [[start, indptr[start]]]
+            while stack:
+                frame = stack[-1]
+                node, end = frame[0], indptr[frame[0] + 1]
+                # Descend into the next dependency that still needs a depth
+                while frame[1] < end:
+                    dep = indices[frame[1]]
+                    frame[1] += 1
+                    if dep < entry_count and depths[dep] < 0 and not on_path[dep]:
+                        on_path[dep] = 1
+                        stack.append([dep, indptr[dep]])
+                        break
+                else:
+                    stack.pop()
+                    on_path[node] = 0
+                    deps = indices[indptr[node] : end]
+                    depths[node] = (
+                        1 + max(depths[d] if d < entry_count and depths[d] > 0 else 0 for d in deps)
+                        if deps
+                        else 0
+                    )
+
+        result = dict(zip(ids, depths, strict=False))
+        self._cache["depths"] = result
+        return result
+
+    def _dependency_closures(self) -> dict[str, int]:
+        """
+        Map each entry ID to a bitset of itself plus everything it transitively depends on.
+
+        Bit i stands for ids[i] of _index_graph(). Closures are built bottom-up
+        in topological order (Kahn's algorithm), so each one is the union of
+        its dependencies' closures, a single | per dependency. Entries on a
+        dependency cycle are left out.
+        """
+        closures: dict[str, int] | None = self._cache.get("closures")
+        if closures is not None:
+            return closures
+
+        ids, indptr, indices = self._index_graph()
+        entry_count = len(self.entries)
+        dependents: list[list[int]] = [[] for _ in range(entry_count)]
+        remaining = [0] * entry_count
+        for node in range(entry_count):
+            deps = {dep for dep in indices[indptr[node] : indptr[node + 1]] if dep < entry_count}
+            remaining[node] = len(deps)
+            for dep in deps:
+                dependents[dep].append(node)
+
+        # Every closure includes its own bit, so entries left at 0 are on a cycle
+        masks = [0] * entry_count
+        ready = [node for node, count in enumerate(remaining) if count == 0]
+        while ready:
+            node = ready.pop()
+            mask = 1 << node
+            for dep in indices[indptr[node] : indptr[node + 1]]:
+                # IDs without an entry have no dependencies of their own
+                mask |= masks[dep] if dep < entry_count else 1 << dep
+            masks[node] = mask
+
+            for dependent in dependents[node]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        closures = {ids[node]: mask for node, mask in enumerate(masks) if mask}
+        self._cache["closures"] = closures
+        return closures
+
+    def get_variable_dependencies(self, var_name: Hashable) -> set[str]:
         """Get all trace IDs that a variable depends on."""
         if var_name not in self.variable_assignments:
             return set()
 
         trace_id = self.variable_assignments[var_name]
+        closure = self._dependency_closures().get(trace_id)
+        if closure is not None:
+            # Decode the bitset one lowest set bit at a time
+            ids = self._index_graph()[0]
+            dependencies = set()
+            while closure:
+                lowest = closure & -closure
+                dependencies.add(ids[lowest.bit_length() - 1])
+                closure ^= lowest
+            return dependencies
+        if self.get_entry(trace_id) is None:
+            return {trace_id}
+
+        # Only reached for entries on a dependency cycle
         dependencies = set()
-
-        def collect_deps(node_id: str) -> None:
+        stack = [trace_id]
+        while stack:
+            node_id = stack.pop()
             if node_id in dependencies:
-                return
+                continue
 
             dependencies.add(node_id)
-            entry = next((e for e in self.entries if e.id == node_id), None)
+            entry = self.get_entry(node_id)
             if entry:
-                for dep_id in entry.dependencies:
-                    collect_deps(dep_id)
+                stack.extend(entry.dependencies)
 
-        collect_deps(trace_id)
         return dependencies
 
-    def get_dependent_variables(self, var_name: str) -> set[str]:
+    def get_dependent_variables(self, var_name: Hashable) -> set[Hashable]:
         """Get all variables that depend on a given variable."""
         if var_name not in self.variable_assignments:
             return set()
 
-        trace_id = self.variable_assignments[var_name]
-        dependent_vars = set()
+        memo: dict[Hashable, set[Hashable]] = self._cache.setdefault("dependent_variables", {})
+        if var_name in memo:
+            return set(memo[var_name])
 
         reverse_deps = self.get_reverse_dependencies()
+        vars_by_id: dict[str, list[Hashable]] | None = self._cache.get("vars_by_id")
+        if vars_by_id is None:
+            vars_by_id = {}
+            for var, tid in self.variable_assignments.items():
+                vars_by_id.setdefault(tid, []).append(var)
+            self._cache["vars_by_id"] = vars_by_id
+
+        # Follow reverse dependencies through entries that are bound to a variable
+        dependent_vars: set[Hashable] = set()
+        visited: set[str] = set()
+        stack = [self.variable_assignments[var_name]]
+        while stack:
+            for dep_id in reverse_deps.get(stack.pop(), ()):
+                if dep_id in vars_by_id and dep_id not in visited:
+                    visited.add(dep_id)
+                    dependent_vars.update(vars_by_id[dep_id])
+                    stack.append(dep_id)
 
-        def collect_dependents(node_id: str) -> None:
-            for dep_id in reverse_deps.get(node_id, []):
-                # Find which variable this trace ID belongs to
-                for var, tid in self.variable_assignments.items():
-                    if tid == dep_id:
-                        dependent_vars.add(var)
-                        collect_dependents(dep_id)
+        memo[var_name] = dependent_vars
+        return set(dependent_vars)
 
-        collect_dependents(trace_id)
-        return dependent_vars
+
+# Default for record_assignment's value: bind the most recent draw
+_LAST_DRAW: Any = object()
 
 
 class TraceableDrawFn:
     """A draw function that records generation traces."""
 
-    def __init__(self, trace: GenerationTrace):
+    def __init__(
+        self, trace: GenerationTrace, sampler: Callable[[Strategy[Any]], Any] | None = None
+    ):
         self.trace = trace
+        # Optional override for how values are drawn, e.g. to bias generation
+        self.sampler = sampler
         self._current_dependencies: list[str] = []
         self._dependency_stack: list[list[str]] = []
+        # The most recent draw made through this function
+        self._last_trace_id: str | None = None
+        self._last_value: Any = _LAST_DRAW
 
     def __call__(self, strategy: Strategy[Any]) -> Any:
         """Draw a value from a strategy and record it in the trace."""
-        value = strategy.generate()
+        value = strategy.generate() if self.sampler is None else self.sampler(strategy)
 
         # Record the trace entry with current dependencies
         trace_id = self.trace.add_entry(
@@ -164,11 +372,13 @@ class TraceableDrawFn:
         # Add this trace ID to current dependencies for future draws
         self._current_dependencies.append(trace_id)
 
+        self._last_trace_id = trace_id
+        self._last_value = value
         return value
 
     def with_dependencies(self, dependencies: list[str]) -> "TraceableDrawFn":
         """Create a new draw function with specific dependencies."""
-        new_draw = TraceableDrawFn(self.trace)
+        new_draw = TraceableDrawFn(self.trace, self.sampler)
         new_draw._current_dependencies = dependencies.copy()
         new_draw._dependency_stack = self._dependency_stack.copy()
         return new_draw
@@ -182,8 +392,26 @@ class TraceableDrawFn:
         if self._dependency_stack:
             self._current_dependencies = self._dependency_stack.pop()
 
-    def record_assignment(self, var_name: str, value: Any) -> None:
-        """Record a variable assignment in the trace."""
+    def record_assignment(self, var_name: Hashable, value: Any = _LAST_DRAW) -> None:
+        """
+        Record a variable assignment in the trace.
+
+        Without a value, the variable is bound to this function's most recent
+        draw. Otherwise it is bound to the most recent entry with an equal value.
+        """
+        if value is _LAST_DRAW:
+            if self._last_trace_id is not None:
+                self.trace.assign_variable(var_name, self._last_trace_id)
+            return
+
+        # The usual case: recording the value that was just drawn. Equal small
+        # values are often the same object, so this only applies while our draw
+        # is still the trace's latest entry, not after a sibling draw fn's
+        entries = self.trace.entries
+        if value is self._last_value and entries and entries[-1].id == self._last_trace_id:
+            self.trace.assign_variable(var_name, entries[-1].id)
+            return
+
         # Find the most recent trace entry for this value
         for entry in reversed(self.trace.entries):
             if entry.value == value:
@@ -191,8 +419,10 @@ class TraceableDrawFn:
                 break
 
 
-def create_traceable_draw() -> tuple[TraceableDrawFn, GenerationTrace]:
+def create_traceable_draw(
+    sampler: Callable[[Strategy[Any]], Any] | None = None,
+) -> tuple[TraceableDrawFn, GenerationTrace]:
     """Create a traceable draw function and its associated trace."""
     trace = GenerationTrace()
-    draw_fn = TraceableDrawFn(trace)
+    draw_fn = TraceableDrawFn(trace, sampler)
     return draw_fn, trace
@@ -5,10 +5,39 @@ These tests verify SnakeCheck's internal functionality without using the @given
 making them compatible with pytest's test discovery and execution.
 """
 
+import copy
+import itertools
+import random
+
 import pytest
 
-from snakecheck.composite import CompositeStrategy, composite, composite_strategy
-from snakecheck.generators import Strategy, booleans, choices, floats, integers, lists, strings
+from snakecheck.composite import (
+    CompositeStrategy,
+    TracedCompositeStrategy,
+    composite,
+    composite_strategy,
+    traced_composite,
+)
+from snakecheck.generators import (
+    _SHARED_RNG,
+    Strategy,
+    _seeded_generators,
+    booleans,
+    choices,
+    floats,
+    integers,
+    lists,
+    strings,
+)
+from snakecheck.property import PropertyTest
+from snakecheck.shrinking import DataflowAwareShrinker
+from snakecheck.trace import GenerationTrace, create_traceable_draw
+
+
+@pytest.fixture(scope="session", autouse=True)
+def seed_shared_random():
+    """Seed the generator unseeded strategies share, once per session, so runs are reproducible."""
+    random.seed(0xC0FFEE)
 
 
 class TestBasicStrategies:
@@ -19,9 +48,8 @@ class TestBasicStrategies:
         strategy = integers(-10, 10)
         assert isinstance(strategy, Strategy)
 
-        # Generate multiple values to ensure they're in range
-        for _ in range(100):
-            value = strategy.generate()
+        # Generate multiple values in one bulk draw to ensure they're in range
+        for value in strategy.generate_batch(100):
             assert isinstance(value, int)
             assert -10 <= value <= 10
 
@@ -35,27 +63,82 @@ class TestBasicStrategies:
             assert isinstance(value, str)
             assert 3 <= len(value) <= 8
 
+    def test_strategy_seed(self):
+        """Test that a seeded strategy draws reproducibly from its own generator."""
+        first = integers(0, 1000)
+        second = integers(0, 1000)
+        first.seed(42)
+        second.seed(42)
+
+        values = [first.generate() for _ in range(20)]
+        random.seed(0)  # The shared generator no longer affects seeded strategies
+        assert [second.generate() for _ in range(20)] == values
+
+    def test_seeded_generators_are_restored(self):
+        """Test that temporarily seeded strategies get their own generators back."""
+        shared = integers(0, 1000)
+        own = integers(0, 1000)
+        own.seed(3)
+        own_rng = own._rng
+
+        with _seeded_generators([shared, own], 5):
+            values = [shared.generate(), own.generate()]
+        with _seeded_generators([shared, own], 5):
+            assert [shared.generate(), own.generate()] == values
+
+        assert shared._rng is _SHARED_RNG
+        assert own._rng is own_rng
+
+        class NoInit(Strategy[int]):
+            """User strategy whose __init__ skips Strategy.__init__."""
+
+            def __init__(self):
+                pass
+
+            def generate(self):
+                return random.randint(0, 10)
+
+        bare = NoInit()
+        with _seeded_generators([bare], 5):
+            assert 0 <= bare.generate() <= 10
+        assert not hasattr(bare, "_rng")
+
+    def test_unseeded_strategy_shares_random(self):
+        """Test that unseeded strategies follow random.seed and survive copying."""
+        strategy = integers(0, 1000)
+        random.seed(7)
+        values = [strategy.generate() for _ in range(20)]
+        random.seed(7)
+        assert [strategy.generate() for _ in range(20)] == values
+
+        assert copy.deepcopy(strategy) is strategy
+        assert not hasattr(strategy, "__dict__")
+
+    def test_strings_alphabet(self):
+        """Test that strings only use their alphabet, ASCII or not."""
+        for alphabet in ("ab", "xyz", "xyz0", "αβγ"):
+            strategy = strings(min_length=0, max_length=20, alphabet=alphabet)
+            for value in [strategy.generate() for _ in range(50)] + strategy.generate_batch(50):
+                assert len(value) <= 20
+                assert set(value) <= set(alphabet)
+
     def test_booleans_strategy(self):
         """Test boolean strategy generation."""
         strategy = booleans()
         assert isinstance(strategy, Strategy)
 
-        values = set()
-        for _ in range(100):
-            value = strategy.generate()
-            assert isinstance(value, bool)
-            values.add(value)
+        values = strategy.generate_batch(100)
+        assert all(isinstance(value, bool) for value in values)
 
         # Should generate both True and False
-        assert len(values) == 2
+        assert set(values) == {True, False}
 
     def test_floats_strategy(self):
         """Test float strategy generation."""
         strategy = floats(-5.0, 5.0)
         assert isinstance(strategy, Strategy)
 
-        for _ in range(100):
-            value = strategy.generate()
+        for value in strategy.generate_batch(100):
             assert isinstance(value, float)
             assert -5.0 <= value <= 5.0
 
@@ -66,11 +149,17 @@ class TestBasicStrategies:
 
         for _ in range(100):
             value = strategy.generate()
-            assert isinstance(value, list)
+            # Exact type checks: the factories never return subclasses
+            assert type(value) is list
             assert 0 <= len(value) <= 5
-            for item in value:
-                assert isinstance(item, int)
-                assert 1 <= item <= 10
+            assert all(type(item) is int and 1 <= item <= 10 for item in value)
+
+        batch = strategy.generate_batch(100)
+        assert len(batch) == 100
+        for value in batch:
+            assert type(value) is list
+            assert 0 <= len(value) <= 5
+            assert all(type(item) is int and 1 <= item <= 10 for item in value)
 
     def test_choices_strategy(self):
         """Test choices strategy generation."""
@@ -78,14 +167,40 @@ class TestBasicStrategies:
         strategy = choices(options)
         assert isinstance(strategy, Strategy)
 
-        values = set()
-        for _ in range(100):
-            value = strategy.generate()
-            assert value in options
-            values.add(value)
+        # Should generate all options, and nothing else
+        assert set(strategy.generate_batch(100)) == set(options)
+
+    def test_generate_batch(self):
+        """Test batch generation of strategy values."""
+        strategy = integers(-10, 10)
+
+        values = strategy.generate_batch(100)
+        assert len(values) == 100
+        for value in values:
+            assert isinstance(value, int)
+            assert -10 <= value <= 10
+
+    def test_generate_batch_bulk_strategies(self):
+        """Test the bulk batch draws of the primitive strategies."""
+        float_values = floats(-1.0, 1.0).generate_batch(100)
+        assert len(float_values) == 100
+        assert all(-1.0 <= value <= 1.0 for value in float_values)
+
+        bool_values = booleans().generate_batch(100)
+        assert set(bool_values) == {True, False}
 
-        # Should generate all options
-        assert len(values) == 3
+        choice_values = choices(["a", "b", "c"]).generate_batch(100)
+        assert set(choice_values) <= {"a", "b", "c"}
+
+        # Ranges too wide for random.choices fall back to per-value draws
+        wide_values = integers(0, 2**60).generate_batch(10)
+        assert all(0 <= value <= 2**60 for value in wide_values)
+        # That includes spans past 2**32, where random.choices is measurably skewed
+        wide = integers(0, 2**40)
+        wide.seed(7)
+        batch = wide.generate_batch(5)
+        wide.seed(7)
+        assert batch == [wide.generate() for _ in range(5)]
 
 
 class TestStrategyComposition:
@@ -101,6 +216,107 @@ class TestStrategyComposition:
             assert value % 2 == 0
             assert 1 <= value <= 100
 
+        values = strategy.generate_batch(100)
+        assert len(values) == 100
+        assert all(value % 2 == 0 and 1 <= value <= 100 for value in values)
+
+    def test_filter_strategy_retries(self):
+        """Test selective filters over bulk and per-value base strategies."""
+        bulk = integers(1, 5).filter(lambda x: x == 3)
+        per_value = composite(lambda draw: draw(integers(1, 5)) * 2).filter(lambda x: x == 6)
+        for _ in range(20):
+            assert bulk.generate() == 3
+            assert per_value.generate() == 6
+
+        assert bulk.generate_batch(20) == [3] * 20
+
+        with pytest.raises(ValueError):
+            integers(1, 20).filter(lambda x: x > 20).generate()
+        with pytest.raises(ValueError):
+            integers(1, 20).filter(lambda x: x > 20).generate_batch(5)
+
+        # Empty ranges raise ValueError on both paths
+        for empty in (strings(5, 1), lists(integers(), 5, 1)):
+            with pytest.raises(ValueError):
+                empty.generate_batch(3)
+
+        # An empty base range raises ValueError on both paths
+        with pytest.raises(ValueError):
+            integers(5, 1).filter(lambda x: True).generate()
+        with pytest.raises(ValueError):
+            integers(5, 1).filter(lambda x: True).generate_batch(5)
+
+    def test_filter_batch_budget_is_per_value(self):
+        """Test that batches give each value the same 100 attempts as generate()."""
+
+        class Replay(Strategy[int]):
+            """Bulk strategy replaying a fixed cycle of values."""
+
+            def __init__(self, values):
+                super().__init__()
+                self.values = itertools.cycle(values)
+
+            def generate(self):
+                return next(self.values)
+
+            def generate_batch(self, n):
+                return list(itertools.islice(self.values, n))
+
+        # 99 rejections before each accepted value fit the budget
+        assert Replay([1] + [0] * 99).filter(bool).generate_batch(5) == [1] * 5
+        # Predicates may return any truthy value, not just bools
+        assert Replay([300, 0]).filter(lambda x: x).generate_batch(3) == [300] * 3
+        assert Replay([2, 0]).filter(lambda x: x).generate_batch(3) == [2] * 3
+
+        # The 11th value needs 151 attempts, even though the batch as a whole
+        # needs far fewer than 100 per value
+        with pytest.raises(ValueError):
+            Replay([1] * 10 + [0] * 150).filter(bool).generate_batch(11)
+
+    def test_filter_tabulates_small_integer_ranges(self):
+        """Test that filters over small integer ranges check each value only once."""
+        calls = []
+
+        def rare(x):
+            calls.append(x)
+            return x % 50 == 0
+
+        strategy = integers(1, 200).filter(rare)
+        values = strategy.generate_batch(200) + strategy.generate_batch(50)
+        assert set(values) == {50, 100, 150, 200}
+        # One call per value in the range, shared by both batches
+        assert len(calls) == 200
+
+        # Changing the base bounds rebuilds the table
+        strategy.base_strategy.max_value = 120
+        assert set(strategy.generate_batch(150)) == {50, 100}
+
+        # Single draws and batches smaller than the range never tabulate
+        calls.clear()
+        even = integers(1, 200).filter(lambda x: calls.append(x) or x % 2 == 0)
+        even.generate()
+        even.generate_batch(50)
+        assert calls[:200] != list(range(1, 201))
+
+    def test_filter_tabulation_falls_back_when_predicate_raises(self):
+        """Test that a predicate raising during tabulation falls back to rejection sampling."""
+        calls = []
+        failed = []
+
+        def fails_first(x):
+            calls.append(x)
+            if not failed:
+                failed.append(x)
+                raise ZeroDivisionError
+            return x % 2 == 0
+
+        strategy = integers(0, 9).filter(fails_first)
+        assert all(value % 2 == 0 for value in strategy.generate_batch(20))
+        # The failed table isn't retried, so later batches only test their own draws
+        calls.clear()
+        strategy.generate_batch(20)
+        assert calls[:10] != list(range(10))
+
     def test_map_strategy(self):
         """Test mapping strategies."""
         strategy = integers(1, 10).map(lambda x: x * 2)
@@ -111,6 +327,8 @@ class TestStrategyComposition:
             assert value % 2 == 0
             assert 2 <= value <= 20
 
+        assert all(value % 2 == 0 and 2 <= value <= 20 for value in strategy.generate_batch(100))
+
 
 class TestCompositeStrategies:
     """Test composite strategy functionality."""
@@ -126,8 +344,7 @@ class TestCompositeStrategies:
         strategy = composite(point_strategy)
         assert isinstance(strategy, CompositeStrategy)
 
-        for _ in range(100):
-            point = strategy.generate()
+        for point in strategy.generate_batch(100):
             assert isinstance(point, dict)
             assert "x" in point
             assert "y" in point
@@ -145,8 +362,7 @@ class TestCompositeStrategies:
 
         assert isinstance(user_strategy, CompositeStrategy)
 
-        for _ in range(100):
-            user = user_strategy.generate()
+        for user in user_strategy.generate_batch(100):
             assert isinstance(user, dict)
             assert "name" in user
             assert "age" in user
@@ -158,23 +374,28 @@ class TestCompositeStrategies:
     def test_nested_composite_strategies(self):
         """Test nested composite strategies."""
 
+        # Build the leaf strategies once instead of on every draw
+        streets = strings(min_length=5, max_length=20)
+        cities = strings(min_length=3, max_length=15)
+        names = strings(min_length=2, max_length=15)
+        ages = integers(18, 100)
+
         @composite_strategy
         def address_strategy(draw):
-            street = draw(strings(min_length=5, max_length=20))
-            city = draw(strings(min_length=3, max_length=15))
+            street = draw(streets)
+            city = draw(cities)
             return {"street": street, "city": city}
 
         @composite_strategy
         def person_strategy(draw):
-            name = draw(strings(min_length=2, max_length=15))
-            age = draw(integers(18, 100))
+            name = draw(names)
+            age = draw(ages)
             address = draw(address_strategy)
             return {"name": name, "age": age, "address": address}
 
         assert isinstance(person_strategy, CompositeStrategy)
 
-        for _ in range(100):
-            person = person_strategy.generate()
+        for person in person_strategy.generate_batch(100):
             assert isinstance(person, dict)
             assert "name" in person
             assert "age" in person
@@ -183,6 +404,55 @@ class TestCompositeStrategies:
             assert "street" in person["address"]
             assert "city" in person["address"]
 
+    def test_generate_many_with_trace(self):
+        """Test batch generation of composite values with traces."""
+
+        @composite_strategy
+        def pair_strategy(draw):
+            return (draw(integers(0, 10)), draw(integers(0, 10)))
+
+        samples = pair_strategy.generate_many_with_trace(20)
+        assert len(samples) == 20
+        for pair, trace in samples:
+            assert [entry.value for entry in trace.entries] == list(pair)
+
+    def test_generate_with_trace_sampler(self):
+        """Test that a sampler overrides how traced draws are generated."""
+
+        @composite_strategy
+        def pair_strategy(draw):
+            return (draw(integers(0, 10)), draw(integers(0, 10)))
+
+        pair, trace = pair_strategy.generate_with_trace(sampler=lambda strategy: 7)
+        assert pair == (7, 7)
+        assert [entry.value for entry in trace.entries] == [7, 7]
+
+    def test_traced_composite_records_assignments(self):
+        """Test that traced composites record variable assignments in their trace."""
+
+        @traced_composite
+        def sequence_strategy(draw):
+            x = draw(integers(0, 10))
+            draw.record_assignment("x", x)
+            y = draw(integers(x, 20))
+            draw.record_assignment("y", y)
+            return x, y
+
+        assert isinstance(sequence_strategy, TracedCompositeStrategy)
+
+        # Plain generation skips recording but draws the same way
+        x, y = sequence_strategy.generate()
+        assert x <= y
+        assert all(x <= y for x, y in sequence_strategy.generate_batch(5))
+
+        (x, y), trace = sequence_strategy.generate_with_trace()
+        assert x <= y
+        assert set(trace.variable_assignments) == {"x", "y"}
+
+        for (x, y), trace in sequence_strategy.generate_many_with_trace(5):
+            assert x <= y
+            assert len(trace.entries) == 2
+
 
 class TestStrategyProperties:
     """Test strategy properties and invariants."""
@@ -215,6 +485,219 @@ class TestStrategyProperties:
         assert all(1 <= v <= 100 for v in values)
 
 
+class TestGenerationTrace:
+    """Test generation trace dependency queries."""
+
+    def test_connected_components(self):
+        """Test that components follow dependencies in both directions."""
+        trace = GenerationTrace()
+        strategy = integers(0, 10)
+        a = trace.add_entry(strategy, 1)
+        b = trace.add_entry(strategy, 2, dependencies=[a])
+        c = trace.add_entry(strategy, 3)
+        d = trace.add_entry(strategy, 4, dependencies=[b])
+
+        assert trace.get_connected_components() == [{a, b, d}, {c}]
+
+        # Adding an entry invalidates the memoized graph
+        e = trace.add_entry(strategy, 5, dependencies=[c])
+        assert trace.get_connected_components() == [{a, b, d}, {c, e}]
+
+    def test_variable_dependencies_track_new_entries(self):
+        """Test that memoized dependency queries see entries added later."""
+        trace = GenerationTrace()
+        strategy = integers(0, 10)
+        a = trace.add_entry(strategy, 1)
+        trace.assign_variable("a", a)
+        assert trace.get_variable_dependencies("a") == {a}
+        assert trace.get_dependent_variables("a") == set()
+
+        b = trace.add_entry(strategy, 2, dependencies=[a])
+        trace.assign_variable("b", b)
+        assert trace.get_variable_dependencies("b") == {a, b}
+        assert trace.get_dependent_variables("a") == {"b"}
+
+    def test_dependency_graphs_are_memoized(self):
+        """Test that dependency graphs are reused until the trace changes."""
+        trace = GenerationTrace()
+        strategy = integers(0, 10)
+        a = trace.add_entry(strategy, 1)
+        b = trace.add_entry(strategy, 2, dependencies=[a])
+
+        assert trace.get_dependency_graph() is trace.get_dependency_graph()
+        assert trace.get_reverse_dependencies() == {a: {b}}
+
+        c = trace.add_entry(strategy, 3, dependencies=[a])
+        assert trace.get_dependency_graph() == {a: set(), b: {a}, c: {a}}
+        assert trace.get_reverse_dependencies() == {a: {b, c}}
+        assert trace.get_dependency_depths() == {a: 0, b: 1, c: 1}
+
+    def test_get_entry(self):
+        """Test looking up entries by ID, including after the trace changes."""
+        trace = GenerationTrace()
+        strategy = integers(0, 10)
+        a = trace.add_entry(strategy, 1)
+        assert trace.get_entry(a) is trace.entries[0]
+        assert trace.get_entry("missing") is None
+
+        b = trace.add_entry(strategy, 2, dependencies=[a])
+        entry = trace.get_entry(b)
+        assert entry is not None
+        assert entry.value == 2
+
+    def test_record_assignment_binds_draws(self):
+        """Test that assignments bind to the draw that produced them."""
+        draw, trace = create_traceable_draw()
+        draw(integers(5, 5))
+        draw.record_assignment("x")
+        y = draw(integers(5, 5))
+        draw.record_assignment("y", y)
+
+        # Equal values still bind to separate draws
+        assert trace.variable_assignments == {"x": "t0", "y": "t1"}
+
+        # After a sibling draw fn draws the same (interned) value, the value
+        # binds to the latest matching entry rather than this fn's last draw
+        sibling = draw.with_dependencies(["t1"])
+        sibling(integers(5, 5))
+        draw.record_assignment("z", y)
+        assert trace.variable_assignments["z"] == "t2"
+
+
+class TestPropertyTest:
+    """Test PropertyTest's example runner."""
+
+    def test_workers_replay_first_failure(self):
+        """Test that examples checked in worker processes report their first failure."""
+        prop = PropertyTest(max_examples=200, verbose=False, workers=2, seed=1)
+        failures = []
+
+        @prop.forall(integers(0, 100))
+        def below_90(x):
+            if x >= 90:
+                failures.append(x)
+                raise AssertionError
+
+        with pytest.raises(RuntimeError):
+            below_90()
+        # Only the replayed failure (and its shrink attempts) ran in this process
+        assert failures[0] >= 90
+        assert prop.examples_failed == 1
+        assert prop.examples_tried < 200
+
+    def test_workers_replay_seeded_strategy(self):
+        """Test that replaying a worker failure reproduces own-seeded strategies' draws."""
+        strategy = integers(0, 100)
+        strategy.seed(11)
+        own_rng = strategy._rng
+        state = random.getstate()
+        prop = PropertyTest(max_examples=200, verbose=False, workers=2, seed=1)
+        failures = []
+
+        @prop.forall(strategy)
+        def below_90(x):
+            if x >= 90:
+                failures.append(x)
+                raise AssertionError
+
+        with pytest.raises(RuntimeError):
+            below_90()
+        # The first example run in this process is the worker's first failure
+        assert failures[0] >= 90
+        assert prop.examples_failed == 1
+        assert strategy._rng is own_rng
+        assert random.getstate() == state
+
+
+class TestDataflowShrinking:
+    """Test the dataflow-aware shrinker."""
+
+    def test_sort_by_dependency_depth_handles_deep_chains(self):
+        """Test that depth sorting walks long dependency chains without recursing."""
+        trace = GenerationTrace()
+        strategy = integers(0, 10)
+        previous = trace.add_entry(strategy, 0)
+        for value in range(1, 5000):
+            previous = trace.add_entry(strategy, value, dependencies=[previous])
+        trace.entries.reverse()
+
+        shrinker = DataflowAwareShrinker(trace)
+        ordered = shrinker._sort_by_dependency_depth(trace.entries)
+        assert [entry.value for entry in ordered] == list(range(5000))
+
+    def test_minimize_int_and_sequences(self):
+        """Test binary search on integers, delta debugging and element-wise list shrinks."""
+        shrinker = DataflowAwareShrinker(GenerationTrace())
+        assert shrinker._minimize_int(1000, lambda v: v >= 37) == 37
+        assert shrinker._minimize_int(-1000, lambda v: v <= -5) == -5
+        assert shrinker._minimize_int(50, lambda v: True) == 0
+
+        assert shrinker._ddmin(list(range(20)), lambda v: 3 in v and 17 in v) == [3, 17]
+        assert shrinker._ddmin("hello world", lambda v: "w" in v) == "w"
+
+        assert shrinker._shrink_numeric_elements([40, 7.5], lambda v: len(v) == 2) == [0, 0.0]
+        assert shrinker._shrink_numeric_elements([40, 7.5], lambda v: sum(v) > 10) == [10, 1.0]
+        assert shrinker._shrink_numeric_elements([-40, -7.5], lambda v: sum(v) < -10) == [-10, -1.0]
+        assert shrinker._shrink_numeric_elements([-3, 5], lambda v: v[1] > 0) == [0, 1]
+        assert shrinker._shrink_numeric_elements(["a", 1], lambda v: True) == ["a", 1]
+
+    def test_shrinking_respects_max_shrinks(self):
+        """Test that both shrinkers stop once their attempt budget is spent."""
+        calls = []
+
+        def always_fails(*values):
+            calls.append(values)
+            raise AssertionError
+
+        # Halving -1 never reaches 0, so only the budget ends this loop
+        prop = PropertyTest(verbose=False, max_shrinks=20)
+        assert prop._shrink_example(always_fails, [-1], (), {}, AssertionError()) is None
+        assert len(calls) == 20
+
+        def fails_from_300(values):
+            if values["t0"] >= 300:
+                raise AssertionError
+
+        trace = GenerationTrace()
+        trace.add_entry(integers(0, 1000), 1000)
+        shrinker = DataflowAwareShrinker(trace, max_shrinks=3)
+        value, _ = shrinker.shrink_failing_example(fails_from_300)
+        assert shrinker.shrinks_tried == 3
+        assert value["t0"] > 300
+
+    def test_shrinker_tests_each_candidate_once(self):
+        """Test that repeated candidate traces reuse the remembered outcome."""
+        calls = []
+
+        def fails_from_300(values):
+            calls.append(values)
+            if values["t0"] >= 300:
+                raise AssertionError
+
+        trace = GenerationTrace()
+        trace.add_entry(integers(0, 1000), 1000)
+        shrinker = DataflowAwareShrinker(trace)
+        assert shrinker._test_trace(trace, fails_from_300)
+        assert shrinker._test_trace(trace, fails_from_300)
+        assert len(calls) == 1
+
+    def test_accept_updates_dependents_count(self):
+        """Test that accepting a removal keeps the dependents counts current."""
+        trace = GenerationTrace()
+        root = trace.add_entry(integers(0, 10), 1)
+        shared = trace.add_entry(integers(0, 10), 2, dependencies=[root])
+        trace.add_entry(integers(0, 10), 3, dependencies=[shared])
+        trace.add_entry(integers(0, 10), 4, dependencies=[shared])
+
+        shrinker = DataflowAwareShrinker(trace)
+        assert "reverse_dependencies" not in vars(shrinker)
+        assert shrinker._dependents_count[shared] == 2
+        new_trace = shrinker._remove_entry(trace, shared)
+        assert shrinker._accept(new_trace, shared) is new_trace
+        assert shrinker._dependents_count[shared] == 0
+        assert shrinker._dependents_count[root] == 0
+
+
 if __name__ == "__main__":
     # Run tests directly if file is executed
     pytest.main([__file__, "-v"])